@@ -1 +1,10 @@
 from django.contrib import admin
+
+from common import models
+
+
+@admin.register(models.StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ("name", "references")
+    search_fields = ("name",)
+    readonly_fields = ("name", "references")
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AbstractBaseUser
+from django.http import HttpRequest
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def get_request_user(request: HttpRequest) -> Optional[AbstractBaseUser]:
+    """Authenticate a plain Django request with the REST framework authentication classes"""
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except exceptions.AuthenticationFailed:
+            return None
+        if result:
+            return result[0]
+    return None
+
+
+async def aget_request_user(request: HttpRequest) -> Optional[AbstractBaseUser]:
+    return await sync_to_async(get_request_user)(request)
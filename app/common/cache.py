@@ -0,0 +1,29 @@
+import time
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_or_set_once(key: str, default: Callable[[], Any], timeout: int) -> Any:
+    """Like cache.get_or_set, but while one caller computes a missing value the others wait for it"""
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while not cache.add(lock_key, True, timeout=settings.CACHE_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return default()
+        time.sleep(settings.CACHE_LOCK_WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    try:
+        value = cache.get(key)
+        if value is None:
+            value = default()
+            cache.set(key, value, timeout=timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
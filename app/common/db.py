@@ -0,0 +1,21 @@
+from typing import List
+
+from django.db import connections, models, transaction
+from django.db.models import sql
+
+
+def update_returning(queryset: models.QuerySet, **values) -> List[models.Model]:
+    """Update rows and return them as instances, in a single statement where the database supports RETURNING"""
+    connection = connections[queryset.db]
+    if connection.vendor not in ("postgresql", "sqlite") or not connection.features.can_return_columns_from_insert:
+        with transaction.atomic(using=queryset.db):
+            primary_keys = list(queryset.select_for_update().values_list("pk", flat=True))
+            queryset.model._base_manager.using(queryset.db).filter(pk__in=primary_keys).update(**values)
+            return list(queryset.model._base_manager.using(queryset.db).filter(pk__in=primary_keys))
+
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    update_sql, params = query.get_compiler(queryset.db).as_sql()
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in queryset.model._meta.concrete_fields)
+    # A raw queryset maps the returned columns to fields and applies the database converters
+    return list(queryset.model._base_manager.db_manager(queryset.db).raw(f"{update_sql} RETURNING {columns}", params))
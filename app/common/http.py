@@ -0,0 +1,55 @@
+import datetime
+import hashlib
+import re
+from typing import Optional, Tuple
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+BYTE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_etag(*parts) -> str:
+    """Build a quoted ETag from the values that identify a representation"""
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def get_not_modified_response(
+        request: HttpRequest,
+        etag: str,
+        last_modified: Optional[datetime.datetime] = None
+) -> Optional[HttpResponse]:
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_conditional_headers(
+        response: HttpResponse,
+        etag: str,
+        last_modified: Optional[datetime.datetime] = None
+) -> HttpResponse:
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def get_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=" range into first and last byte, raise ValueError if it can't be satisfied"""
+    match = BYTE_RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        first, last = max(size - int(last), 0), size - 1
+    else:
+        first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first > last or first >= size:
+        raise ValueError(header)
+    return first, last
@@ -0,0 +1,71 @@
+import hashlib
+from io import BytesIO
+from typing import Dict
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+def get_source_hash(file: File) -> str:
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def process_image(file: File) -> ContentFile:
+    """Decode an uploaded image, apply its EXIF orientation, drop its metadata and limit its size"""
+    file.seek(0)
+    with Image.open(file) as image:
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(settings.IMAGE_MAX_SIZE)
+        for key in ("exif", "xmp", "XML:com.adobe.xmp", "comment"):
+            image.info.pop(key, None)
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = BytesIO()
+        image.save(output, format=image_format, quality=settings.IMAGE_QUALITY)
+    return ContentFile(output.getvalue())
+
+
+def get_variants_name(source_hash: str) -> str:
+    return f"variants/{source_hash[:2]}/{source_hash}"
+
+
+def get_variant_name(source_hash: str, variant: str) -> str:
+    return f"{get_variants_name(source_hash)}/{variant}.{settings.IMAGE_VARIANT_FORMAT.lower()}"
+
+
+def render_variant(file: File, size: tuple) -> ContentFile:
+    file.seek(0)
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        output = BytesIO()
+        image.save(output, format=settings.IMAGE_VARIANT_FORMAT, quality=settings.IMAGE_VARIANT_QUALITY)
+    file.seek(0)
+    return ContentFile(output.getvalue())
+
+
+def create_variants(file: File, source_hash: str) -> None:
+    """Render every configured variant that is not stored yet, variants are shared by identical sources"""
+    for variant, size in settings.IMAGE_VARIANTS.items():
+        name = get_variant_name(source_hash, variant)
+        if not default_storage.exists(name):
+            default_storage.save(name, render_variant(file, size))
+
+
+def delete_variants(source_hash: str) -> None:
+    for variant in settings.IMAGE_VARIANTS:
+        default_storage.delete(get_variant_name(source_hash, variant))
+
+
+def get_variant_urls(source_hash: str) -> Dict[str, str]:
+    return {variant: default_storage.url(get_variant_name(source_hash, variant)) for variant in settings.IMAGE_VARIANTS}
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('references', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Stored file',
+                'verbose_name_plural': 'Stored files',
+            },
+        ),
+    ]
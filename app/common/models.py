@@ -1,7 +1,11 @@
 import datetime
 from typing import Type
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+
+from common import images
+from common.storage import get_image_storage
 
 
 def get_upload_path(instance: Type[models.Model], filename: str):
@@ -9,10 +13,113 @@ def get_upload_path(instance: Type[models.Model], filename: str):
     return f"{instance.__class__.__name__.lower()}/{'/'.join(str(datetime.date.today()).split('-'))}/{filename}"
 
 
+class StoredFile(models.Model):
+    """Reference count of a content-addressed file, its row is locked while the file is stored or deleted"""
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Stored file"
+        verbose_name_plural = "Stored files"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.references})"
+
+    @classmethod
+    def lock(cls, name: str) -> "StoredFile":
+        """Lock the row of a file until the end of the transaction, creating it when needed"""
+        while True:
+            cls.objects.get_or_create(name=name)
+            try:
+                return cls.objects.select_for_update().get(name=name)
+            except cls.DoesNotExist:
+                # Deleted together with its file while we waited for the lock
+                continue
+
+    @classmethod
+    def add_reference(cls, name: str) -> None:
+        cls.objects.filter(name=name).update(references=F("references") + 1)
+
+    @classmethod
+    def remove_reference(cls, name: str) -> None:
+        cls.objects.filter(name=name, references__gt=0).update(references=F("references") - 1)
+
+
 class Image(models.Model):
-    image = models.ImageField(upload_to=get_upload_path)
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
+    image = models.ImageField(upload_to=get_upload_path, storage=get_image_storage, db_index=True)
+    source_hash = models.CharField(max_length=64, blank=True, editable=False)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.READY, editable=False)
 
     class Meta:
         verbose_name = "Image"
         verbose_name_plural = "Images"
         abstract = True
+
+    def save(self, *args, **kwargs) -> None:
+        if not self.image or self.image._committed:
+            return super().save(*args, **kwargs)
+        field = self.image.field
+        name = field.storage.get_content_name(field.generate_filename(self, self.image.name), self.image)
+        previous_name = type(self)._base_manager.filter(pk=self.pk).values_list("image", flat=True).first()
+        with transaction.atomic():
+            # The lock keeps a concurrent delete of an identical file from removing it before the row is inserted
+            StoredFile.lock(name)
+            super().save(*args, **kwargs)
+            StoredFile.add_reference(name)
+            if previous_name and previous_name != name:
+                type(self).release_file(previous_name)
+
+    @classmethod
+    def release_file(cls, name: str, source_hash: str = "") -> None:
+        """Drop a reference to a stored file, it is deleted after commit if it was the last one"""
+        StoredFile.remove_reference(name)
+        transaction.on_commit(lambda: cls.delete_unreferenced_file(name, source_hash))
+
+    @classmethod
+    def delete_unreferenced_file(cls, name: str, source_hash: str = "") -> None:
+        """Delete a stored file and its variants once no image references them, identical images share them"""
+        with transaction.atomic():
+            stored_file = StoredFile.lock(name)
+            if stored_file.references or cls._base_manager.filter(image=name).exists():
+                return
+            cls._meta.get_field("image").storage.delete(name)
+            stored_file.delete()
+        if source_hash:
+            with transaction.atomic():
+                variants = StoredFile.lock(images.get_variants_name(source_hash))
+                if not cls._base_manager.filter(source_hash=source_hash).exists():
+                    images.delete_variants(source_hash)
+                variants.delete()
+
+    def process(self) -> None:
+        """Store the processed version of the uploaded file and render variants, must run in a transaction"""
+        with self.image.open("rb") as file:
+            content = images.process_image(file)
+        storage = self.image.storage
+        name = storage.get_content_name(self.image.name, content)
+        StoredFile.lock(name)
+        self.image.name = storage.save(name, content)
+        StoredFile.add_reference(name)
+        self.source_hash = images.get_source_hash(content)
+        StoredFile.lock(images.get_variants_name(self.source_hash))
+        images.create_variants(content, self.source_hash)
+        self.status = self.Status.READY
+
+    def ensure_variants(self) -> bool:
+        """Create variants for images stored before they were generated on upload, must run in a transaction"""
+        if self.source_hash or self.status != self.Status.READY:
+            return False
+        self.source_hash = images.get_source_hash(self.image)
+        StoredFile.lock(images.get_variants_name(self.source_hash))
+        images.create_variants(self.image, self.source_hash)
+        type(self)._base_manager.filter(pk=self.pk).update(source_hash=self.source_hash)
+        return True
+
+    @property
+    def variant_urls(self) -> dict:
+        return images.get_variant_urls(self.source_hash) if self.source_hash else {}
@@ -0,0 +1,31 @@
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+from common import images
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store files under the hash of their content, saving an already stored content reuses its file"""
+
+    def get_content_name(self, name: str, content: File) -> str:
+        source_hash = images.get_source_hash(content)
+        namespace = name.split("/", 1)[0] if "/" in name else ""
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(namespace, source_hash[:2], source_hash[2:4], f"{source_hash}{extension}")
+
+    def save(self, name, content, max_length=None) -> str:
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def get_image_storage() -> ContentAddressedStorage:
+    return storages["images"]
@@ -0,0 +1,79 @@
+import os
+import re
+import tempfile
+from typing import BinaryIO, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from rest_framework import exceptions
+
+from common.exceptions import Conflict
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class ChunkedUploadFile(File):
+    """Assembled upload, file system storage moves it into place instead of copying it"""
+
+    def temporary_file_path(self) -> str:
+        return self.file.name
+
+
+def get_chunks_path(upload_id) -> str:
+    return os.path.join(settings.FILE_UPLOAD_CHUNKS_DIR, str(upload_id))
+
+
+def parse_content_range(header: str) -> Tuple[int, int, int]:
+    """Parse a "bytes start-end/total" header into start, exclusive end and total"""
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        raise exceptions.ValidationError({"Content-Range": "Expected bytes <start>-<end>/<total>."})
+    start, end, total = map(int, match.groups())
+    if start > end or end >= total:
+        raise exceptions.ValidationError({"Content-Range": "Invalid byte range."})
+    return start, end + 1, total
+
+
+def read_chunk(stream: BinaryIO, length: int) -> BinaryIO:
+    """Read a chunk from the client into a temporary file, so a slow body isn't read while the upload is locked"""
+    file = tempfile.TemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR)
+    remaining = length
+    while remaining:
+        chunk = stream.read(min(remaining, settings.FILE_UPLOAD_CHUNK_SIZE))
+        if not chunk:
+            break
+        file.write(chunk)
+        remaining -= len(chunk)
+    if remaining:
+        file.close()
+        raise exceptions.ValidationError({"Content-Range": "Body is shorter than the byte range."})
+    file.seek(0)
+    return file
+
+
+def append_chunk(path: str, stream: BinaryIO, offset: int, length: int) -> int:
+    """Stream a chunk to the end of the file, return the new offset"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as file:
+        if file.tell() != offset:
+            raise Conflict(f"Upload offset is {file.tell()}.")
+        remaining = length
+        while remaining:
+            chunk = stream.read(min(remaining, settings.FILE_UPLOAD_CHUNK_SIZE))
+            if not chunk:
+                break
+            file.write(chunk)
+            remaining -= len(chunk)
+        if remaining:
+            file.truncate(offset)
+            raise exceptions.ValidationError({"Content-Range": "Body is shorter than the byte range."})
+        return file.tell()
+
+
+def open_chunks(path: str, filename: str) -> ChunkedUploadFile:
+    return ChunkedUploadFile(open(path, "rb"), name=filename)
+
+
+def delete_chunks(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
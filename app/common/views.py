@@ -0,0 +1,103 @@
+import datetime
+import mimetypes
+import os
+import posixpath
+from typing import BinaryIO, Iterator
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, parse_http_date_safe
+from django.views import View
+
+from common.http import get_byte_range, get_etag, get_not_modified_response, set_conditional_headers
+
+
+def read_range(file: BinaryIO, first: int, last: int) -> Iterator[bytes]:
+    with file:
+        file.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = file.read(min(remaining, FileResponse.block_size))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class MediaView(View):
+    """Serve MEDIA_ROOT files, delegating the transfer to the front server when MEDIA_SENDFILE is set"""
+
+    def get(self, request: HttpRequest, path: str) -> HttpResponse:
+        path = posixpath.normpath(path).lstrip("/")
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404()
+        if not os.path.isfile(full_path):
+            raise Http404()
+        stat = os.stat(full_path)
+        etag = get_etag(path, stat.st_mtime_ns, stat.st_size)
+        last_modified = datetime.datetime.fromtimestamp(int(stat.st_mtime), tz=datetime.timezone.utc)
+        not_modified_response = get_not_modified_response(request, etag=etag, last_modified=last_modified)
+        if not_modified_response:
+            return self.set_cache_headers(not_modified_response, path)
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if settings.MEDIA_SENDFILE == "nginx":
+            response = HttpResponse(content_type=content_type)
+            response.headers["X-Accel-Redirect"] = quote(f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{path}")
+        elif settings.MEDIA_SENDFILE == "xsendfile":
+            response = HttpResponse(content_type=content_type)
+            response.headers["X-Sendfile"] = full_path
+        else:
+            response = self.get_file_response(request, full_path, stat.st_size, content_type, etag, last_modified)
+        set_conditional_headers(response, etag=etag, last_modified=last_modified)
+        return self.set_cache_headers(response, path)
+
+    def get_file_response(
+            self,
+            request: HttpRequest,
+            full_path: str,
+            size: int,
+            content_type: str,
+            etag: str,
+            last_modified: datetime.datetime,
+    ) -> HttpResponse:
+        byte_range = None
+        if self.is_range_fresh(request, etag, last_modified):
+            try:
+                byte_range = get_byte_range(request.headers.get("Range", ""), size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response.headers["Content-Range"] = f"bytes */{size}"
+                return response
+        if byte_range is None:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+        else:
+            first, last = byte_range
+            response = StreamingHttpResponse(
+                read_range(open(full_path, "rb"), first, last), status=206, content_type=content_type
+            )
+            response.headers["Content-Length"] = str(last - first + 1)
+            response.headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+        response.headers["Accept-Ranges"] = "bytes"
+        return response
+
+    def is_range_fresh(self, request: HttpRequest, etag: str, last_modified: datetime.datetime) -> bool:
+        """A Range is ignored when If-Range names another version of the file"""
+        if_range = request.headers.get("If-Range")
+        if not if_range:
+            return True
+        if if_range.startswith(("\"", "W/")):
+            return parse_etags(if_range) == [etag]
+        return parse_http_date_safe(if_range) == int(last_modified.timestamp())
+
+    def set_cache_headers(self, response: HttpResponse, path: str) -> HttpResponse:
+        if path.startswith(settings.MEDIA_IMMUTABLE_PREFIXES):
+            patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+        return response
@@ -0,0 +1,31 @@
+"""
+Gunicorn config for app project.
+
+Run from the app directory with ``gunicorn -c config/gunicorn.py``.
+SERVER_MODE selects the interface: "wsgi" (threaded workers) or "asgi" (uvicorn workers).
+Send SIGHUP to the master process for a graceful reload.
+"""
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("WEB_THREADS", "4"))
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Settings read the worker count to refuse a per-process cache shared by several workers
+os.environ["WEB_WORKERS"] = str(workers)
+keepalive = int(os.environ.get("WEB_KEEPALIVE", "5"))
+timeout = int(os.environ.get("WEB_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", "100"))
+preload_app = bool(os.environ.get("WEB_PRELOAD"))
+accesslog = os.environ.get("WEB_ACCESS_LOG", "-")
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv, find_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +51,7 @@ INSTALLED_APPS = [
     "tasks.apps.TasksConfig",
     "common.apps.CommonConfig",
     "user.apps.UserConfig",
+    "jobs.apps.JobsConfig",
 ]
 
 MIDDLEWARE = [
@@ -93,9 +96,53 @@ DATABASES = {
         "PASSWORD": os.environ.get("SQL_PASSWORD", ""),
         "HOST": os.environ.get("SQL_HOST", ""),
         "PORT":  int(os.environ.get("SQL_PORT", "")),
+        "CONN_MAX_AGE": int(os.environ.get("SQL_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": bool(os.environ.get("SQL_CONN_HEALTH_CHECKS", "True")),
+        "DISABLE_SERVER_SIDE_CURSORS": bool(os.environ.get("SQL_PGBOUNCER")),
     }
 }
 
+# ASGI runs sync database code in a new thread per request, so a persistent connection would be left behind in each
+if os.environ.get("SERVER_MODE") == "asgi":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Connection pooling needs Django 5.1+ with psycopg 3 ("psycopg[pool]") and replaces persistent connections.
+if os.environ.get("SQL_POOL"):
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('SQL_POOL needs psycopg 3 with its pool, install "psycopg[pool]"')
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("SQL_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("SQL_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.environ.get("SQL_POOL_TIMEOUT", "10")),
+        }
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Writes invalidate lookup names, rendered tasks and list pages by bumping counters in the cache, which other gunicorn
+# workers only see in a shared one
+if (
+    CACHES["default"]["BACKEND"] == "django.core.cache.backends.locmem.LocMemCache"
+    and int(os.environ.get("WEB_WORKERS", "1")) > 1
+):
+    raise ImproperlyConfigured("WEB_WORKERS > 1 needs a CACHE_BACKEND shared between processes, such as RedisCache")
+
+LOOKUP_CACHE_VERSION_TTL = float(os.environ.get("LOOKUP_CACHE_VERSION_TTL", "1"))
+
+TASK_LIST_CACHE_TTL = int(os.environ.get("TASK_LIST_CACHE_TTL", "300"))
+TASK_CACHE_TTL = int(os.environ.get("TASK_CACHE_TTL", "3600"))
+CACHE_LOCK_TIMEOUT = float(os.environ.get("CACHE_LOCK_TIMEOUT", "5"))
+CACHE_LOCK_WAIT_INTERVAL = float(os.environ.get("CACHE_LOCK_WAIT_INTERVAL", "0.05"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -132,24 +179,71 @@ USE_TZ = bool(os.environ.get("USE_TZ"))
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = os.environ.get("STATIC_ROOT", BASE_DIR / "staticfiles")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+JWT_STATELESS_AUTH = bool(os.environ.get("JWT_STATELESS_AUTH", "True"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication"
+        if JWT_STATELESS_AUTH
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
 }
 
 SIMPLE_JWT = {
    "AUTH_HEADER_TYPES": ("JWT",),
+   "TOKEN_OBTAIN_SERIALIZER": "user.authentication.ClaimsTokenObtainPairSerializer",
+   "TOKEN_REFRESH_SERIALIZER": "user.authentication.ClaimsTokenRefreshSerializer",
 }
 
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "60"))
+
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+MEDIA_IMMUTABLE_PREFIXES = ("taskimage/", "variants/")
+MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", str(7 * 24 * 60 * 60)))
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "images": {
+        "BACKEND": "common.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get("FILE_UPLOAD_MAX_MEMORY_SIZE", str(2_621_440)))
+FILE_UPLOAD_TEMP_DIR = os.environ.get("FILE_UPLOAD_TEMP_DIR") or None
+FILE_UPLOAD_CHUNKS_DIR = os.environ.get(
+    "FILE_UPLOAD_CHUNKS_DIR", os.path.join(tempfile.gettempdir(), "task_image_uploads")
+)
+FILE_UPLOAD_CHUNK_SIZE = 64 * 1024
+FILE_UPLOAD_MAX_SIZE = int(os.environ.get("FILE_UPLOAD_MAX_SIZE", str(100 * 1024 * 1024)))
+FILE_UPLOAD_EXPIRY = int(os.environ.get("FILE_UPLOAD_EXPIRY", str(24 * 60 * 60)))
+
+IMAGE_VARIANTS = {
+    "thumbnail": (150, 150),
+    "medium": (800, 800),
+}
+IMAGE_VARIANT_FORMAT = os.environ.get("IMAGE_VARIANT_FORMAT", "WEBP")
+IMAGE_VARIANT_QUALITY = int(os.environ.get("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_MAX_SIZE = (int(os.environ.get("IMAGE_MAX_SIZE", "2048")),) * 2
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "90"))
+
+JOBS_BACKEND = os.environ.get("JOBS_BACKEND", "jobs.backends.DatabaseBackend")
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_TIMEOUT = int(os.environ.get("JOBS_TIMEOUT", "600"))
 
 AUTH_USER_MODEL = "user.User"
 
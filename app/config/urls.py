@@ -13,9 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.conf.urls.static import static
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from common.views import MediaView
 
 from . import settings
 from .yasg import urlpatterns as doc_urls
@@ -28,4 +31,6 @@ urlpatterns = [
 ]
 
 urlpatterns += doc_urls
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.*)$", MediaView.as_view(), name="media"),
+]
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from django.contrib.admin import register
+
+from .models import Job
+
+
+@register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "started_at", "finished_at")
@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from jobs import models, worker
+
+
+class DatabaseBackend:
+    """Store jobs in the database, they are run by the run_jobs management command"""
+
+    def enqueue(self, name: str, payload: dict) -> models.Job:
+        return models.Job.objects.create(name=name, payload=payload)
+
+
+class ImmediateBackend(DatabaseBackend):
+    """Run jobs in the enqueuing process once the transaction commits, for development without a worker"""
+
+    def enqueue(self, name: str, payload: dict) -> models.Job:
+        job = super().enqueue(name, payload)
+        transaction.on_commit(lambda: worker.run_pending())
+        return job
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> DatabaseBackend:
+    return import_string(settings.JOBS_BACKEND)()
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            count = worker.run_pending()
+            if count:
+                self.stdout.write(f"Ran {count} job(s)")
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
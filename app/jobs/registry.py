@@ -0,0 +1,15 @@
+from typing import Callable, Dict
+
+_handlers: Dict[str, Callable] = {}
+
+
+def register(name: str) -> Callable[[Callable], Callable]:
+    """Register a job handler, payload items are passed to it as keyword arguments"""
+    def decorator(handler: Callable) -> Callable:
+        _handlers[name] = handler
+        return handler
+    return decorator
+
+
+def get_handler(name: str) -> Callable:
+    return _handlers[name]
@@ -0,0 +1,5 @@
+from jobs import backends, models
+
+
+def enqueue(name: str, **payload) -> models.Job:
+    return backends.get_backend().enqueue(name, payload)
@@ -0,0 +1,66 @@
+import datetime
+import traceback
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs import models, registry
+
+
+def claim_job() -> Optional[models.Job]:
+    """Take the oldest pending job, or a running one whose worker stopped responding"""
+    stale_at = timezone.now() - datetime.timedelta(seconds=settings.JOBS_TIMEOUT)
+    while True:
+        with transaction.atomic():
+            queryset = models.Job.objects.filter(
+                Q(status=models.Job.Status.PENDING) | Q(status=models.Job.Status.RUNNING, started_at__lt=stale_at)
+            ).order_by("created_at", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            job = queryset.first()
+            if job is None:
+                return None
+            # Without SKIP LOCKED (SQLite) workers may read the same job, only the one whose update matches claims it
+            started_at = timezone.now()
+            claimed = models.Job.objects.filter(id=job.id, status=job.status, attempts=job.attempts).update(
+                status=models.Job.Status.RUNNING,
+                attempts=job.attempts + 1,
+                started_at=started_at,
+            )
+        if claimed:
+            job.status = models.Job.Status.RUNNING
+            job.attempts += 1
+            job.started_at = started_at
+            return job
+
+
+def run_job(job: models.Job) -> models.Job:
+    try:
+        registry.get_handler(job.name)(**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < settings.JOBS_MAX_ATTEMPTS:
+            job.status = models.Job.Status.PENDING
+        else:
+            job.status = models.Job.Status.FAILED
+    else:
+        job.error = ""
+        job.status = models.Job.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+    return job
+
+
+def run_pending(limit: Optional[int] = None) -> int:
+    """Run jobs until the queue is empty or limit jobs were run, return the number of jobs run"""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
@@ -4,7 +4,16 @@ from django.contrib.admin.widgets import AdminFileWidget
 from django.db import models
 from django.utils.safestring import mark_safe
 
-from .models import Category, Status, TaskImage, Task, TaskCompletion
+from .models import (
+    Category,
+    CategoryCompletionCount,
+    Status,
+    Task,
+    TaskCompletion,
+    TaskImage,
+    TaskImageUpload,
+    UserCompletionCount,
+)
 
 
 class TaskImageWidget(AdminFileWidget):
@@ -14,11 +23,12 @@ class TaskImageWidget(AdminFileWidget):
 
         if value and getattr(value, "url", None):
             image_url = value.url
+            thumbnail_url = value.instance.variant_urls.get("thumbnail", image_url)
             file_name = str(value)
 
             output.append(
                 f'<a href="{image_url}" target="_blank">'
-                f'<img src="{image_url}" alt="{file_name}" width="300" height="300" '
+                f'<img src="{thumbnail_url}" alt="{file_name}" width="150" height="150" '
                 f'style="object-fit: cover;"/> </a>')
 
         output.append(super(AdminFileWidget, self).render(name, value, attrs, renderer))
@@ -37,6 +47,7 @@ class StatusAdmin(admin.ModelAdmin):
 
 class TaskImageInline(admin.StackedInline):
     model = TaskImage
+    readonly_fields = ("status",)
     formfield_overrides = {
         models.ImageField: {"widget": TaskImageWidget}
     }
@@ -54,3 +65,23 @@ class TaskAdmin(admin.ModelAdmin):
 class TaskCompletionAdmin(admin.ModelAdmin):
     list_display = ("__str__", "task", "user")
     list_display_links = ("__str__", "task", "user")
+
+    def get_readonly_fields(self, request, obj=None):
+        return ("task", "user") if obj else ()
+
+
+@register(UserCompletionCount)
+class UserCompletionCountAdmin(admin.ModelAdmin):
+    list_display = ("user", "count")
+    readonly_fields = ("user", "count")
+
+
+@register(CategoryCompletionCount)
+class CategoryCompletionCountAdmin(admin.ModelAdmin):
+    list_display = ("category", "count")
+    readonly_fields = ("category", "count")
+
+
+@register(TaskImageUpload)
+class TaskImageUploadAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "user", "created_at")
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest
+
+from common.cache import get_or_set_once
+from tasks import conditional, models
+
+TASK_LIST_GENERATION_KEY = "task_list:generation"
+
+_deferred = threading.local()
+
+
+def get_task_list_generation() -> int:
+    generation = cache.get(TASK_LIST_GENERATION_KEY)
+    if generation is None:
+        cache.add(TASK_LIST_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(TASK_LIST_GENERATION_KEY)
+    return generation
+
+
+def _increment_task_list_generation() -> None:
+    try:
+        cache.incr(TASK_LIST_GENERATION_KEY)
+    except ValueError:
+        cache.set(TASK_LIST_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_task_list() -> None:
+    """Drop cached list pages now and again on commit, so a page read before the commit isn't kept"""
+    if getattr(_deferred, "active", False):
+        _deferred.pending = True
+        return
+    _increment_task_list_generation()
+    transaction.on_commit(_increment_task_list_generation)
+
+
+@contextmanager
+def defer_task_list_invalidation() -> Iterator[None]:
+    """Invalidate once when the block ends instead of once per row saved or deleted in it"""
+    if getattr(_deferred, "active", False):
+        yield
+        return
+    _deferred.active, _deferred.pending = True, False
+    try:
+        yield
+    finally:
+        _deferred.active = False
+    if _deferred.pending:
+        invalidate_task_list()
+
+
+def get_task_list_key(request: HttpRequest) -> str:
+    """Key a list response by its URL with the non-empty query parameters sorted"""
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values if value)
+    url = f"{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f"task_list:{get_task_list_generation()}:{digest}"
+
+
+def get_or_set_task_list_page(request: HttpRequest, get_page: Callable[[], dict]) -> dict:
+    return cache.get_or_set(get_task_list_key(request), get_page, timeout=settings.TASK_LIST_CACHE_TTL)
+
+
+def get_task_key(request: HttpRequest, task: models.Task, expand: str = "") -> str:
+    """Key a rendered task by id, edit stamp, lookup names and the host its links point to"""
+    host = hashlib.md5(request.build_absolute_uri("/").encode(), usedforsecurity=False).hexdigest()
+    stamp = f"{task.version}:{task.edited_at.timestamp()}"
+    return f"task:{task.id}:{stamp}:{conditional.get_lookups_version()}:{expand}:{host}"
+
+
+def get_or_set_task_data(request: HttpRequest, task: models.Task, expand: str, get_data: Callable[[], dict]) -> dict:
+    return get_or_set_once(get_task_key(request, task, expand), get_data, timeout=settings.TASK_CACHE_TTL)
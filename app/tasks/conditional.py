@@ -0,0 +1,55 @@
+import datetime
+from typing import Iterable, Optional
+
+from django.utils.http import parse_etags, quote_etag
+
+from common.exceptions import PreconditionFailed
+from common.http import get_etag
+from tasks import lookups, models
+
+
+def get_lookups_version() -> str:
+    return f"{lookups.get_lookup_version(models.Category)}.{lookups.get_lookup_version(models.Status)}"
+
+
+def get_task_etag(task: models.Task, expand: str = "") -> str:
+    etag = f"{task.id}-{task.version}-{get_lookups_version()}"
+    return quote_etag(f"{etag}-{expand}" if expand else etag)
+
+
+def get_task_version(if_match: str, task_id: int) -> Optional[int]:
+    """Extract the task version from an If-Match header, None for "*" or a missing header"""
+    etags = parse_etags(if_match)
+    if not etags or etags == ["*"]:
+        return None
+    try:
+        etag_task_id, version = map(int, etags[0].strip('"').split("-")[:2])
+    except ValueError:
+        raise PreconditionFailed()
+    if etag_task_id != task_id:
+        raise PreconditionFailed()
+    return version
+
+
+def get_tasks_etag(tasks: Iterable[models.Task], *links: Optional[str]) -> str:
+    """Validate a list page by what it renders: rows with their authors, lookup names and the cursor links
+
+    Lists get no Last-Modified, a deleted row changes the page without making it newer.
+    """
+    return get_etag(
+        "tasks",
+        ",".join(f"{task.id}@{task.edited_at.isoformat()}@{task.user.username}" for task in tasks),
+        get_lookups_version(),
+        *links,
+    )
+
+
+def get_task_image_etag(task_image: models.TaskImage) -> str:
+    return get_etag(
+        "task_image", task_image.id, task_image.title, task_image.image.name, task_image.status, task_image.source_hash
+    )
+
+
+def get_task_image_last_modified(task_image: models.TaskImage) -> Optional[datetime.datetime]:
+    """Uploaded images change when processed and gain variants later, so only complete ones are compared by date"""
+    return task_image.created_at if task_image.status == models.TaskImage.Status.READY and task_image.source_hash else None
@@ -0,0 +1,20 @@
+from typing import Optional, Type
+
+from django.db import models as db_models
+from django.db.models import F
+
+from tasks import models
+
+
+def _change_count(model: Type[db_models.Model], key: str, value: int, delta: int) -> None:
+    if model.objects.filter(**{key: value}).update(count=F("count") + delta):
+        return
+    model.objects.get_or_create(**{key: value})
+    model.objects.filter(**{key: value}).update(count=F("count") + delta)
+
+
+def change_completion_counts(user_id: int, category_id: Optional[int], delta: int) -> None:
+    """Keep completion counters in step with TaskCompletion rows, call inside the same transaction"""
+    _change_count(models.UserCompletionCount, "user_id", user_id, delta)
+    if category_id is not None:
+        _change_count(models.CategoryCompletionCount, "category_id", category_id, delta)
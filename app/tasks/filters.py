@@ -3,9 +3,21 @@ import django_filters
 from tasks import models
 
 
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
 class TaskFilter(django_filters.FilterSet):
+    category = django_filters.NumberFilter(field_name="category_id")
+    category__in = NumberInFilter(field_name="category_id")
+    status = django_filters.NumberFilter(field_name="status_id")
+    status__in = NumberInFilter(field_name="status_id")
     category__name = django_filters.CharFilter(lookup_expr="icontains")
+    category__name__exact = django_filters.CharFilter(field_name="category__name", lookup_expr="exact")
+    category__name__istartswith = django_filters.CharFilter(field_name="category__name", lookup_expr="istartswith")
     status__name = django_filters.CharFilter(lookup_expr="icontains")
+    status__name__exact = django_filters.CharFilter(field_name="status__name", lookup_expr="exact")
+    status__name__istartswith = django_filters.CharFilter(field_name="status__name", lookup_expr="istartswith")
 
     class Meta:
         model = models.Task
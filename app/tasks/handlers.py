@@ -0,0 +1,38 @@
+from django.db import transaction
+
+from jobs import registry
+from tasks import models, services
+
+
+@registry.register("tasks.process_task_image")
+def process_task_image(task_image_id: int) -> None:
+    task_image = models.TaskImage.objects.filter(id=task_image_id).first()
+    if task_image is None or task_image.status == models.TaskImage.Status.READY:
+        return
+    uploaded_name = task_image.image.name
+    try:
+        with transaction.atomic():
+            task_image.process()
+            updated = models.TaskImage.objects.filter(id=task_image_id).update(
+                image=task_image.image.name,
+                source_hash=task_image.source_hash,
+                status=task_image.status,
+            )
+            # A deleted image already released the uploaded file, the processed one is released instead
+            models.TaskImage.release_file(uploaded_name if updated else task_image.image.name)
+            services.touch_task(task_image.task_id)
+    except Exception:
+        failed = models.TaskImage.objects.filter(id=task_image_id).exclude(status=models.TaskImage.Status.FAILED)
+        if failed.update(status=models.TaskImage.Status.FAILED):
+            services.touch_task(task_image.task_id)
+        raise
+
+
+@registry.register("tasks.create_task_image_variants")
+def create_task_image_variants(task_image_id: int) -> None:
+    task_image = models.TaskImage.objects.filter(id=task_image_id).first()
+    if task_image is None:
+        return
+    with transaction.atomic():
+        if task_image.ensure_variants():
+            services.touch_task(task_image.task_id)
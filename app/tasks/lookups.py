@@ -0,0 +1,72 @@
+import time
+from functools import lru_cache
+from typing import Dict, Type
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+
+_versions: Dict[str, tuple] = {}
+
+
+def _get_version_key(label: str) -> str:
+    return f"lookup:{label}:version"
+
+
+def get_lookup_version(model: Type[models.Model]) -> int:
+    """Return table version, re-read from the shared cache every LOOKUP_CACHE_VERSION_TTL seconds"""
+    label = model._meta.label_lower
+    version, checked_at = _versions.get(label, (None, 0.0))
+    if version is not None and time.monotonic() - checked_at < settings.LOOKUP_CACHE_VERSION_TTL:
+        return version
+    key = _get_version_key(label)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    _versions[label] = (version, time.monotonic())
+    return version
+
+
+def _increment_lookup_version(label: str) -> None:
+    key = _get_version_key(label)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+    _versions[label] = (version, time.monotonic())
+
+
+def invalidate_lookup(model: Type[models.Model]) -> None:
+    """Bump the table version now and again on commit, so names read before the commit aren't kept"""
+    label = model._meta.label_lower
+    _increment_lookup_version(label)
+    transaction.on_commit(lambda: _increment_lookup_version(label))
+
+
+@lru_cache(maxsize=32)
+def _get_names(label: str, version: int) -> Dict[int, str]:
+    key = f"lookup:{label}:{version}"
+    names = cache.get(key)
+    if names is None:
+        names = dict(apps.get_model(label).objects.values_list("id", "name"))
+        cache.set(key, names, timeout=None)
+    return names
+
+
+def get_lookup_names(model: Type[models.Model]) -> Dict[int, str]:
+    return _get_names(model._meta.label_lower, get_lookup_version(model))
+
+
+async def aget_lookup_names(*lookup_models: Type[models.Model]) -> Dict[Type[models.Model], Dict[int, str]]:
+    return await sync_to_async(lambda: {model: get_lookup_names(model) for model in lookup_models})()
+
+
+def get_lookup_name(model: Type[models.Model], pk: int) -> str:
+    names = get_lookup_names(model)
+    if pk in names:
+        return names[pk]
+    return model.objects.values_list("name", flat=True).get(pk=pk)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from jobs import services as jobs_services
+from tasks import models
+
+
+class Command(BaseCommand):
+    help = "Queue variant generation for ready task images stored before variants existed"
+
+    def handle(self, *args, **options):
+        ids = models.TaskImage.objects.filter(status=models.TaskImage.Status.READY, source_hash="").values_list(
+            "id", flat=True
+        )
+        count = 0
+        for task_image_id in ids.iterator():
+            jobs_services.enqueue("tasks.create_task_image_variants", task_image_id=task_image_id)
+            count += 1
+        self.stdout.write(f"Queued {count} task image(s)")
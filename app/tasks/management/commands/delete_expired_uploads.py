@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks import services
+
+
+class Command(BaseCommand):
+    help = "Delete chunked task image uploads that expired before completion"
+
+    def handle(self, *args, **options):
+        count = services.delete_expired_task_image_uploads()
+        self.stdout.write(f"Deleted {count} upload(s)")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskimage',
+            name='source_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:07
+
+import common.models
+import common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_taskimageupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=common.storage.get_image_storage, upload_to=common.models.get_upload_path),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:13
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}.text, '')), 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE FUNCTION tasks_task_search_vector_update() RETURNS trigger AS $$ "
+            f"BEGIN NEW.search_vector := {POSTGRESQL_SEARCH_VECTOR.format(row='NEW')}; RETURN NEW; END "
+            "$$ LANGUAGE plpgsql"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER tasks_task_search_vector_trigger BEFORE INSERT OR UPDATE OF title, text ON tasks_task "
+            "FOR EACH ROW EXECUTE FUNCTION tasks_task_search_vector_update()"
+        )
+        schema_editor.execute(
+            f"UPDATE tasks_task SET search_vector = {POSTGRESQL_SEARCH_VECTOR.format(row='tasks_task')}"
+        )
+        schema_editor.execute("CREATE INDEX tasks_task_search_vector_idx ON tasks_task USING gin (search_vector)")
+    elif vendor == "sqlite":
+        # SQLite drops triggers when a migration rebuilds tasks_task, recreate them after such migrations
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tasks_task_fts USING fts5(title, text, content='tasks_task', content_rowid='id')"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+            "INSERT INTO tasks_task_fts(rowid, title, text) VALUES (new.id, new.title, new.text); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+            "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, text) "
+            "VALUES ('delete', old.id, old.title, old.text); END"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, text ON tasks_task BEGIN "
+            "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, text) "
+            "VALUES ('delete', old.id, old.title, old.text); "
+            "INSERT INTO tasks_task_fts(rowid, title, text) VALUES (new.id, new.title, new.text); END"
+        )
+        schema_editor.execute("INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS tasks_task_search_vector_idx")
+        schema_editor.execute("DROP TRIGGER IF EXISTS tasks_task_search_vector_trigger ON tasks_task")
+        schema_editor.execute("DROP FUNCTION IF EXISTS tasks_task_search_vector_update()")
+    elif vendor == "sqlite":
+        for trigger in ("tasks_task_fts_insert", "tasks_task_fts_delete", "tasks_task_fts_update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_task_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskimage_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def fill_completion_counts(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskCompletion = apps.get_model("tasks", "TaskCompletion")
+    UserCompletionCount = apps.get_model("tasks", "UserCompletionCount")
+    CategoryCompletionCount = apps.get_model("tasks", "CategoryCompletionCount")
+    TaskCompletion.objects.update(
+        category_id=Subquery(Task.objects.filter(id=OuterRef("task_id")).values("category_id")[:1])
+    )
+    UserCompletionCount.objects.bulk_create(
+        UserCompletionCount(user_id=row["user_id"], count=row["count"])
+        for row in TaskCompletion.objects.values("user_id").annotate(count=Count("id"))
+    )
+    CategoryCompletionCount.objects.bulk_create(
+        CategoryCompletionCount(category_id=row["category_id"], count=row["count"])
+        for row in TaskCompletion.objects.exclude(category=None).values("category_id").annotate(count=Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_user_created_at_id_idx'),
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskcompletion',
+            name='category',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tasks.category'),
+        ),
+        migrations.CreateModel(
+            name='CategoryCompletionCount',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='completion_count', serialize=False, to='tasks.category')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Category Completion Count',
+                'verbose_name_plural': 'Category Completion Counts',
+                'indexes': [models.Index(fields=['-count'], name='category_completion_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserCompletionCount',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='completion_count', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'User Completion Count',
+                'verbose_name_plural': 'User Completion Counts',
+                'indexes': [models.Index(fields=['-count'], name='user_completion_count_idx')],
+            },
+        ),
+        migrations.RunPython(fill_completion_counts, migrations.RunPython.noop),
+    ]
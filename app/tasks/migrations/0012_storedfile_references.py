@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:16
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_stored_file_references(apps, schema_editor):
+    TaskImage = apps.get_model("tasks", "TaskImage")
+    StoredFile = apps.get_model("common", "StoredFile")
+    StoredFile.objects.bulk_create(
+        StoredFile(name=row["image"], references=row["references"])
+        for row in TaskImage.objects.exclude(image="").values("image").annotate(references=Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_completion_counts'),
+        ('common', '0001_storedfile'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stored_file_references, migrations.RunPython.noop),
+    ]
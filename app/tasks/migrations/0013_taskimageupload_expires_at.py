@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:00
+
+import tasks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_storedfile_references'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskimageupload',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, default=tasks.models.get_upload_expiry),
+        ),
+    ]
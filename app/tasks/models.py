@@ -1,4 +1,10 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 
 from common.models import Image
 from user.models import User
@@ -10,6 +16,9 @@ class Category(models.Model):
     class Meta:
         verbose_name = "Category"
         verbose_name_plural = "Categories"
+        indexes = [
+            models.Index(fields=["name"], name="category_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -21,6 +30,9 @@ class Status(models.Model):
     class Meta:
         verbose_name = "Task Status"
         verbose_name_plural = "Task Statuses"
+        indexes = [
+            models.Index(fields=["name"], name="status_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -39,6 +51,27 @@ class TaskImage(Image):
         return f"{self.task.id} task's {self.title}"
 
 
+def get_upload_expiry() -> datetime.datetime:
+    return timezone.now() + datetime.timedelta(seconds=settings.FILE_UPLOAD_EXPIRY)
+
+
+class TaskImageUpload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=get_upload_expiry, db_index=True)
+
+    class Meta:
+        verbose_name = "Task Image Upload"
+        verbose_name_plural = "Task Image Uploads"
+
+    def __str__(self) -> str:
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
 class Task(models.Model):
     title = models.CharField(max_length=255)
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
@@ -48,10 +81,19 @@ class Task(models.Model):
     available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     edited_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="task_created_at_id_idx"),
+            models.Index(fields=["available", "-created_at"], name="task_available_created_at_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="task_user_created_at_id_idx"),
+            models.Index(fields=["category", "available"], name="task_category_available_idx"),
+            models.Index(fields=["status", "available"], name="task_status_available_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title[:30]
@@ -60,6 +102,7 @@ class Task(models.Model):
 class TaskCompletion(models.Model):
     task = models.OneToOneField(Task, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.DO_NOTHING)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, editable=False)
     completed_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -68,3 +111,35 @@ class TaskCompletion(models.Model):
 
     def __str__(self) -> str:
         return f"{self.task.title[:20]} by {self.user.first_name} {self.user.last_name}"
+
+
+class UserCompletionCount(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="completion_count")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "User Completion Count"
+        verbose_name_plural = "User Completion Counts"
+        indexes = [
+            models.Index(fields=["-count"], name="user_completion_count_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} completed {self.count}"
+
+
+class CategoryCompletionCount(models.Model):
+    category = models.OneToOneField(
+        Category, on_delete=models.CASCADE, primary_key=True, related_name="completion_count"
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Category Completion Count"
+        verbose_name_plural = "Category Completion Counts"
+        indexes = [
+            models.Index(fields=["-count"], name="category_completion_count_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.category} completed {self.count}"
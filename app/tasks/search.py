@@ -0,0 +1,37 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+
+
+def get_fts5_query(query: str) -> str:
+    """Quote every term so that user input is matched literally instead of as FTS5 syntax"""
+    return " ".join(f'"{term.replace(chr(34), chr(34) * 2)}"' for term in query.split())
+
+
+def search_tasks(queryset: QuerySet, query: str) -> QuerySet:
+    """Filter tasks matching the query in title or text, best matches first"""
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        )
+    elif connection.vendor == "sqlite":
+        fts5_query = get_fts5_query(query)
+        queryset = queryset.filter(
+            id__in=RawSQL("SELECT rowid FROM tasks_task_fts WHERE tasks_task_fts MATCH %s", [fts5_query])
+        ).annotate(
+            rank=RawSQL(
+                "SELECT -bm25(tasks_task_fts, 10.0, 1.0) FROM tasks_task_fts "
+                "WHERE tasks_task_fts MATCH %s AND rowid = tasks_task.id",
+                [fts5_query],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        queryset = queryset.filter(Q(title__icontains=query) | Q(text__icontains=query)).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+    return queryset.order_by("-rank", "-id")
@@ -1,6 +1,23 @@
+import os
+
+from django.conf import settings
+from django.core.validators import get_available_image_extensions, validate_image_file_extension
 from rest_framework import serializers
 
-from tasks import models
+from tasks import lookups, models
+
+
+class LookupNameField(serializers.Field):
+    def __init__(self, model, **kwargs):
+        self.model = model
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value: int) -> str:
+        names = self.context.get("lookup_names", {}).get(self.model, {})
+        if value in names:
+            return names[value]
+        return lookups.get_lookup_name(self.model, value)
 
 
 class TaskCreateSerializerIn(serializers.ModelSerializer):
@@ -9,9 +26,67 @@ class TaskCreateSerializerIn(serializers.ModelSerializer):
         fields = ["title", "category", "status", "text", "available"]
 
 
+class TaskUpdateSerializerIn(TaskCreateSerializerIn):
+    def validate(self, attrs: dict) -> dict:
+        unknown_fields = set(self.initial_data) - set(self.fields)
+        if unknown_fields:
+            raise serializers.ValidationError({field: ["Unknown field."] for field in sorted(unknown_fields)})
+        return attrs
+
+
+class TaskBulkListSerializer(serializers.ListSerializer):
+    related_models = {"category": models.Category, "status": models.Status}
+
+    def to_internal_value(self, data) -> list:
+        items = super().to_internal_value(data)
+        existing_ids = {
+            field: set(
+                model.objects.filter(id__in={item[field] for item in items if field in item}).values_list("id", flat=True)
+            )
+            for field, model in self.related_models.items()
+        }
+        errors = [
+            {
+                field: [f'Invalid pk "{item[field]}" - object does not exist.']
+                for field in self.related_models
+                if field in item and item[field] not in existing_ids[field]
+            }
+            for item in items
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return [
+            {f"{key}_id" if key in self.related_models else key: value for key, value in item.items()}
+            for item in items
+        ]
+
+
+class TaskBulkCreateSerializerIn(TaskCreateSerializerIn):
+    category = serializers.IntegerField()
+    status = serializers.IntegerField()
+
+    class Meta(TaskCreateSerializerIn.Meta):
+        list_serializer_class = TaskBulkListSerializer
+
+
+class TaskBulkUpdateSerializerIn(TaskCreateSerializerIn):
+    id = serializers.IntegerField()
+    category = serializers.IntegerField(required=False)
+    status = serializers.IntegerField(required=False)
+
+    class Meta(TaskCreateSerializerIn.Meta):
+        fields = ["id", "title", "category", "status", "text", "available"]
+        extra_kwargs = {field: {"required": False} for field in ["title", "text", "available"]}
+        list_serializer_class = TaskBulkListSerializer
+
+
+class TaskBulkDeleteSerializerIn(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
 class TaskCreateSerializerOut(serializers.ModelSerializer):
-    category = serializers.CharField(source="category.name")
-    status = serializers.CharField(source="status.name")
+    category = LookupNameField(model=models.Category, source="category_id")
+    status = LookupNameField(model=models.Status, source="status_id")
 
     class Meta:
         model = models.Task
@@ -19,8 +94,8 @@ class TaskCreateSerializerOut(serializers.ModelSerializer):
 
 
 class TaskListSerializer(serializers.ModelSerializer):
-    category = serializers.CharField(source="category.name")
-    status = serializers.CharField(source="status.name")
+    category = LookupNameField(model=models.Category, source="category_id")
+    status = LookupNameField(model=models.Status, source="status_id")
     user = serializers.CharField(source="user.username")
 
     class Meta:
@@ -28,6 +103,37 @@ class TaskListSerializer(serializers.ModelSerializer):
         fields = ["id", "category", "status", "user", "available"]
 
 
+class TaskSearchSerializerIn(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
+
+
+class TaskSearchSerializer(TaskListSerializer):
+    class Meta(TaskListSerializer.Meta):
+        fields = ["id", "title", "category", "status", "user", "available"]
+
+
+class TaskCompletionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.TaskCompletion
+        fields = ["task", "user", "completed_at"]
+
+
+class UserCompletionCountSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="user.username")
+
+    class Meta:
+        model = models.UserCompletionCount
+        fields = ["user", "username", "count"]
+
+
+class CategoryCompletionCountSerializer(serializers.ModelSerializer):
+    name = LookupNameField(model=models.Category, source="category_id")
+
+    class Meta:
+        model = models.CategoryCompletionCount
+        fields = ["category", "name", "count"]
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Category
@@ -41,20 +147,59 @@ class StatusSerializer(serializers.ModelSerializer):
 
 
 class TaskImageCreateSerializer(serializers.ModelSerializer):
+    image = serializers.FileField(validators=[validate_image_file_extension])
+    task = serializers.PrimaryKeyRelatedField(queryset=models.Task.objects.only("id", "user_id"))
+
     class Meta:
         model = models.TaskImage
         fields = ["title", "image", "task"]
 
 
+class TaskImageUploadCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.TaskImageUpload
+        fields = ["filename", "size"]
+
+    def validate_filename(self, value: str) -> str:
+        extension = os.path.splitext(value)[1][1:].lower()
+        if extension not in get_available_image_extensions():
+            raise serializers.ValidationError(f"File extension “{extension}” is not allowed.")
+        return os.path.basename(value)
+
+    def validate_size(self, value: int) -> int:
+        if not 0 < value <= settings.FILE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Ensure this value is between 1 and {settings.FILE_UPLOAD_MAX_SIZE}.")
+        return value
+
+
+class TaskImageUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.TaskImageUpload
+        fields = ["id", "filename", "size", "offset", "expires_at"]
+
+
 class TaskImageSerializer(serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = models.TaskImage
-        fields = ["id", "title", "image"]
+        fields = ["id", "title", "image", "status", "variants"]
+
+    def get_variants(self, task_image: models.TaskImage) -> dict:
+        request = self.context.get("request")
+        return {
+            variant: request.build_absolute_uri(url) if request else url
+            for variant, url in task_image.variant_urls.items()
+        }
+
+
+class TaskRetrieveSerializerIn(serializers.Serializer):
+    expand = serializers.ChoiceField(choices=["images"], required=False)
 
 
 class TaskRetrieveSerializer(serializers.ModelSerializer):
-    category = serializers.CharField(source="category.name")
-    status = serializers.CharField(source="status.name")
+    category = LookupNameField(model=models.Category, source="category_id")
+    status = LookupNameField(model=models.Status, source="status_id")
     images = serializers.HyperlinkedRelatedField(many=True, read_only=True, view_name="task_image-retrieve")
 
     class Meta:
@@ -69,5 +214,10 @@ class TaskRetrieveSerializer(serializers.ModelSerializer):
             "available",
             "created_at",
             "edited_at",
+            "version",
             "images",
         ]
+
+
+class TaskExpandedRetrieveSerializer(TaskRetrieveSerializer):
+    images = TaskImageSerializer(many=True, read_only=True)
@@ -1,13 +1,36 @@
+from typing import BinaryIO, List, Optional
+
 from django.contrib.auth import get_user_model
-from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import F, QuerySet
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import exceptions
 
-from tasks import models
+from common.db import update_returning
+from common import uploads
+from common.exceptions import Conflict, PreconditionFailed
+from tasks import cache, models
 from tasks import serializers
 
 User = get_user_model()
 
+BULK_BATCH_SIZE = 1000
+
+
+def check_owner(user: User, owner_id: Optional[int]) -> None:
+    """Raise NotFound for a missing object and PermissionDenied if it belongs to another user"""
+    if owner_id is None:
+        raise exceptions.NotFound()
+    if owner_id != user.id:
+        raise exceptions.PermissionDenied()
+
+
+def get_owner_id(queryset: QuerySet, owner_field: str = "user_id") -> Optional[int]:
+    """Return the owner id of the first matched object, following FK id columns in a single query"""
+    return queryset.values_list(owner_field, flat=True).first()
+
 
 def create_task(user: User, data: dict) -> models.Task:
     task_serializer = serializers.TaskCreateSerializerIn(data=data)
@@ -18,51 +41,211 @@ def create_task(user: User, data: dict) -> models.Task:
     return task
 
 
-def get_task(id_: int) -> models.Task:
-    task = get_object_or_404(models.Task, id=id_)
+def bulk_create_tasks(user: User, data: list) -> List[models.Task]:
+    task_serializer = serializers.TaskBulkCreateSerializerIn(data=data, many=True)
+    task_serializer.is_valid(raise_exception=True)
+    tasks = [models.Task(user=user, **task_data) for task_data in task_serializer.validated_data]
+    with transaction.atomic():
+        models.Task.objects.bulk_create(tasks, batch_size=BULK_BATCH_SIZE)
+        cache.invalidate_task_list()
+    return tasks
+
+
+def bulk_update_tasks(user: User, data: list) -> List[models.Task]:
+    task_serializer = serializers.TaskBulkUpdateSerializerIn(data=data, many=True)
+    task_serializer.is_valid(raise_exception=True)
+    tasks_data = task_serializer.validated_data
+    with transaction.atomic():
+        tasks = (
+            models.Task.objects.select_for_update()
+            .filter(user=user, id__in=[task_data["id"] for task_data in tasks_data])
+            .in_bulk()
+        )
+        errors = [{} if task_data["id"] in tasks else {"id": ["Task does not exist."]} for task_data in tasks_data]
+        if any(errors):
+            raise exceptions.ValidationError(errors)
+        edited_at = timezone.now()
+        fields = {"edited_at", "version"}
+        for task_data in tasks_data:
+            task = tasks[task_data["id"]]
+            for field, value in task_data.items():
+                setattr(task, field, value)
+            task.edited_at = edited_at
+            task.version += 1
+            fields.update(task_data.keys() - {"id"})
+        models.Task.objects.bulk_update(tasks.values(), fields=sorted(fields), batch_size=BULK_BATCH_SIZE)
+        cache.invalidate_task_list()
+    return [tasks[task_data["id"]] for task_data in tasks_data]
+
+
+def bulk_delete_tasks(user: User, data: dict) -> None:
+    ids_serializer = serializers.TaskBulkDeleteSerializerIn(data=data)
+    ids_serializer.is_valid(raise_exception=True)
+    ids = ids_serializer.validated_data["ids"]
+    with transaction.atomic():
+        queryset = models.Task.objects.filter(user=user, id__in=ids)
+        existing_ids = set(queryset.select_for_update().values_list("id", flat=True))
+        if len(existing_ids) != len(set(ids)):
+            raise exceptions.ValidationError(
+                {"ids": [[] if id_ in existing_ids else ["Task does not exist."] for id_ in ids]}
+            )
+        with cache.defer_task_list_invalidation():
+            queryset.delete()
+
+
+def touch_task(id_: int) -> None:
+    """Mark the task as edited when something rendered with it changes"""
+    models.Task.objects.filter(id=id_).update(edited_at=timezone.now(), version=F("version") + 1)
+    cache.invalidate_task_list()
+
+
+def get_task_state(id_: int) -> models.Task:
+    """Load only what authorizes a retrieval and identifies its cached representation"""
+    return get_object_or_404(models.Task.objects.only("id", "user_id", "available", "version", "edited_at"), id=id_)
+
+
+def get_task(id_: int, prefetch_images: bool = False) -> models.Task:
+    queryset = models.Task.objects.prefetch_related("images") if prefetch_images else models.Task.objects.all()
+    task = get_object_or_404(queryset, id=id_)
+    return task
+
+
+async def aget_task(id_: int) -> models.Task:
+    try:
+        task = await models.Task.objects.prefetch_related("images").aget(id=id_)
+    except models.Task.DoesNotExist:
+        raise Http404()
     return task
 
 
 def delete_task(user: User, id_: int) -> None:
-    task = get_object_or_404(models.Task, id=id_, user=user)
+    task = get_object_or_404(models.Task, id=id_, user_id=user.id)
     task.delete()
 
 
-def update_task(user: User, id_: int, data: dict) -> models.Task:
-    task = models.Task.objects.filter(id=id_)
-    if not task:
-        raise exceptions.NotFound()
-    if user.id != task[0].user.id:
+def update_task(user: User, id_: int, data: dict, version: Optional[int] = None) -> models.Task:
+    task_serializer = serializers.TaskUpdateSerializerIn(data=data, partial=True)
+    task_serializer.is_valid(raise_exception=True)
+    task = models.Task.objects.filter(id=id_, user_id=user.id)
+    if version is not None:
+        task = task.filter(version=version)
+    tasks = update_returning(
+        task,
+        **task_serializer.validated_data,
+        edited_at=timezone.now(),
+        version=F("version") + 1,
+    )
+    if not tasks:
+        check_owner(user, get_owner_id(models.Task.objects.filter(id=id_)))
+        raise PreconditionFailed()
+    cache.invalidate_task_list()
+    return tasks[0]
+
+
+def complete_task(user: User, id_: int) -> models.TaskCompletion:
+    task = get_object_or_404(models.Task.objects.only("id", "user_id", "available", "category_id"), id=id_)
+    if not task.available and task.user_id != user.id:
         raise exceptions.PermissionDenied()
     try:
-        task.update(**data)
-    except FieldDoesNotExist as exception:
-        raise exceptions.ValidationError(detail=exception.args[0])
-    task = task[0]
-    return task
+        with transaction.atomic():
+            return models.TaskCompletion.objects.create(task=task, user=user, category_id=task.category_id)
+    except IntegrityError:
+        raise Conflict("The task is already completed.")
+
+
+@transaction.atomic
+def uncomplete_task(user: User, id_: int) -> None:
+    completion = get_object_or_404(
+        models.TaskCompletion.objects.annotate(task_user_id=F("task__user_id")),
+        task_id=id_,
+    )
+    if user.id not in (completion.user_id, completion.task_user_id):
+        raise exceptions.PermissionDenied()
+    completion.delete()
 
 
 def create_task_image(user: User, data: dict) -> models.TaskImage:
     task_image_serializer = serializers.TaskImageCreateSerializer(data=data)
     task_image_serializer.is_valid(raise_exception=True)
     task_image_data = task_image_serializer.validated_data
-    task = get_object_or_404(models.Task, id=task_image_data["task"].id)
-    if user.id != task.user.id:
-        raise exceptions.PermissionDenied()
+    check_owner(user, task_image_data["task"].user_id)
     task_image = models.TaskImage.objects.create(**task_image_data)
     return task_image
 
 
+def create_task_image_upload(user: User, data: dict) -> models.TaskImageUpload:
+    upload_serializer = serializers.TaskImageUploadCreateSerializer(data=data)
+    upload_serializer.is_valid(raise_exception=True)
+    return models.TaskImageUpload.objects.create(user=user, **upload_serializer.validated_data)
+
+
+def get_task_image_uploads() -> QuerySet:
+    return models.TaskImageUpload.objects.filter(expires_at__gt=timezone.now())
+
+
+def get_task_image_upload(user: User, upload_id: str) -> models.TaskImageUpload:
+    return get_object_or_404(get_task_image_uploads(), id=upload_id, user_id=user.id)
+
+
+def append_task_image_upload(
+        user: User,
+        upload_id: str,
+        content_range: str,
+        stream: BinaryIO
+) -> models.TaskImageUpload:
+    upload = get_task_image_upload(user=user, upload_id=upload_id)
+    start, end, total = uploads.parse_content_range(content_range)
+    if total != upload.size:
+        raise exceptions.ValidationError({"Content-Range": f"Total size must be {upload.size}."})
+    if start != upload.offset:
+        raise Conflict(f"Upload offset is {upload.offset}.")
+    with uploads.read_chunk(stream, length=end - start) as chunk, transaction.atomic():
+        # The row is locked only to append the buffered chunk, after checking no other request moved the offset
+        upload = get_object_or_404(get_task_image_uploads().select_for_update(), id=upload_id, user_id=user.id)
+        if start != upload.offset:
+            raise Conflict(f"Upload offset is {upload.offset}.")
+        upload.offset = uploads.append_chunk(uploads.get_chunks_path(upload.id), chunk, offset=start, length=end - start)
+        upload.expires_at = models.get_upload_expiry()
+        upload.save(update_fields=["offset", "expires_at"])
+    return upload
+
+
+@transaction.atomic
+def complete_task_image_upload(user: User, upload_id: str, data: dict) -> models.TaskImage:
+    upload = get_object_or_404(get_task_image_uploads().select_for_update(), id=upload_id, user_id=user.id)
+    if upload.offset != upload.size:
+        raise Conflict(f"Upload offset is {upload.offset} of {upload.size}.")
+    with uploads.open_chunks(uploads.get_chunks_path(upload.id), upload.filename) as image:
+        task_image_data = {"title": data.get("title"), "task": data.get("task"), "image": image}
+        task_image = create_task_image(user=user, data=task_image_data)
+    upload.delete()
+    return task_image
+
+
+def delete_task_image_upload(user: User, upload_id: str) -> None:
+    get_task_image_upload(user=user, upload_id=upload_id).delete()
+
+
+def delete_expired_task_image_uploads() -> int:
+    """Delete uploads that were not completed in time, their chunks go with them"""
+    _, deleted = models.TaskImageUpload.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted.get(models.TaskImageUpload._meta.label, 0)
+
+
 def get_task_image(task_image_id: int) -> models.TaskImage:
     task_image = get_object_or_404(models.TaskImage, id=task_image_id)
     return task_image
 
 
-def delete_task_image(user: models.User, task_image_id) -> None:
+async def aget_task_image(task_image_id: int) -> models.TaskImage:
     try:
-        task_image = models.TaskImage.objects.get(id=task_image_id)
+        task_image = await models.TaskImage.objects.aget(id=task_image_id)
     except models.TaskImage.DoesNotExist:
-        raise exceptions.NotFound()
-    if task_image.task.user.pk != user.id:
-        raise exceptions.PermissionDenied
+        raise Http404()
+    return task_image
+
+
+def delete_task_image(user: models.User, task_image_id) -> None:
+    task_image = models.TaskImage.objects.annotate(owner_id=F("task__user_id")).filter(id=task_image_id).first()
+    check_owner(user, task_image.owner_id if task_image else None)
     task_image.delete()
@@ -0,0 +1,90 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from common import uploads
+from jobs import services as jobs_services
+from tasks import cache, counters, lookups, models, services
+from user.models import ClaimsUser
+
+
+@receiver([post_save, post_delete], sender=models.Category)
+@receiver([post_save, post_delete], sender=models.Status)
+def invalidate_lookup(sender, **kwargs) -> None:
+    lookups.invalidate_lookup(sender)
+
+
+@receiver([post_save, post_delete], sender=models.Task)
+@receiver([post_save, post_delete], sender=models.Category)
+@receiver([post_save, post_delete], sender=models.Status)
+def invalidate_task_list(sender, **kwargs) -> None:
+    cache.invalidate_task_list()
+
+
+@receiver(post_save, sender=models.User)
+@receiver(post_save, sender=ClaimsUser)
+def invalidate_task_list_on_username_change(sender, update_fields=None, **kwargs) -> None:
+    """The list shows usernames, last_login updates on every sign in are ignored"""
+    if update_fields is None or "username" in update_fields:
+        cache.invalidate_task_list()
+
+
+# Registered before touch_task so the stored file is locked before the task row, as when an image is saved
+@receiver(post_delete, sender=models.TaskImage)
+def delete_task_image_file(sender, instance: models.TaskImage, **kwargs) -> None:
+    sender.release_file(instance.image.name, instance.source_hash)
+
+
+@receiver([post_save, post_delete], sender=models.TaskImage)
+def touch_task(sender, instance: models.TaskImage, **kwargs) -> None:
+    services.touch_task(instance.task_id)
+
+
+@receiver(pre_save, sender=models.Task)
+def increment_task_version(sender, instance: models.Task, **kwargs) -> None:
+    """Increment the stored version, a stale instance would otherwise write the number of a concurrent update"""
+    if not instance._state.adding:
+        instance.version = F("version") + 1
+
+
+@receiver(post_save, sender=models.Task)
+def refresh_task_version(sender, instance: models.Task, created: bool, **kwargs) -> None:
+    if not created:
+        instance.refresh_from_db(fields=["version"])
+
+
+@receiver(pre_save, sender=models.TaskImage)
+def mark_task_image_pending(sender, instance: models.TaskImage, **kwargs) -> None:
+    if instance.image and not instance.image._committed:
+        instance.status = models.TaskImage.Status.PENDING
+        instance.source_hash = ""
+        instance._process_image = True
+
+
+@receiver(post_save, sender=models.TaskImage)
+def enqueue_task_image_processing(sender, instance: models.TaskImage, **kwargs) -> None:
+    if getattr(instance, "_process_image", False):
+        instance._process_image = False
+        jobs_services.enqueue("tasks.process_task_image", task_image_id=instance.id)
+
+
+@receiver(post_delete, sender=models.TaskImageUpload)
+def delete_task_image_upload_chunks(sender, instance: models.TaskImageUpload, **kwargs) -> None:
+    uploads.delete_chunks(uploads.get_chunks_path(instance.id))
+
+
+@receiver(pre_save, sender=models.TaskCompletion)
+def set_task_completion_category(sender, instance: models.TaskCompletion, **kwargs) -> None:
+    if instance._state.adding and instance.category_id is None:
+        instance.category_id = models.Task.objects.values_list("category_id", flat=True).get(id=instance.task_id)
+
+
+@receiver(post_save, sender=models.TaskCompletion)
+def increment_completion_counts(sender, instance: models.TaskCompletion, created: bool, **kwargs) -> None:
+    if created:
+        counters.change_completion_counts(instance.user_id, instance.category_id, 1)
+
+
+@receiver(post_delete, sender=models.TaskCompletion)
+def decrement_completion_counts(sender, instance: models.TaskCompletion, **kwargs) -> None:
+    counters.change_completion_counts(instance.user_id, instance.category_id, -1)
@@ -9,13 +9,32 @@ router.register("statuses", views.StatusViewSet, basename="status")
 
 urlpatterns = [
     path("list/", views.TaskList.as_view(), name="task-list"),
+    path("mine/", views.TaskMine.as_view(), name="task-mine"),
     path("create/", views.CreateTask.as_view(), name="task-create"),
+    path("search/", views.TaskSearch.as_view(), name="task-search"),
     path("<int:task_id>/", views.TaskRetrieve.as_view(), name="task-retrieve"),
     path("delete/<int:task_id>/", views.TaskDelete.as_view(), name="task-delete"),
     path("update/<int:task_id>/", views.TaskUpdate.as_view(), name="task-update"),
+    path("complete/<int:task_id>/", views.TaskComplete.as_view(), name="task-complete"),
+    path("uncomplete/<int:task_id>/", views.TaskUncomplete.as_view(), name="task-uncomplete"),
+    path("stats/users/", views.UserCompletionCountList.as_view(), name="completion_count-users"),
+    path("stats/categories/", views.CategoryCompletionCountList.as_view(), name="completion_count-categories"),
+    path("bulk/create/", views.TaskBulkCreate.as_view(), name="task-bulk_create"),
+    path("bulk/update/", views.TaskBulkUpdate.as_view(), name="task-bulk_update"),
+    path("bulk/delete/", views.TaskBulkDelete.as_view(), name="task-bulk_delete"),
     path("image/create/", views.TaskImageCreate.as_view(), name="task_image-create"),
+    path("image/upload/", views.TaskImageUploadCreate.as_view(), name="task_image_upload-create"),
+    path("image/upload/<uuid:upload_id>/", views.TaskImageUpload.as_view(), name="task_image_upload-detail"),
+    path(
+        "image/upload/<uuid:upload_id>/complete/",
+        views.TaskImageUploadComplete.as_view(),
+        name="task_image_upload-complete",
+    ),
     path("image/<int:pk>/", views.TaskImageRetrieve.as_view(), name="task_image-retrieve"),
-    path("image/delete/<int:pk>/", views.TaskImageDelete.as_view(), name="task_image-delete")
+    path("image/delete/<int:pk>/", views.TaskImageDelete.as_view(), name="task_image-delete"),
+    path("async/list/", views.AsyncTaskList.as_view(), name="task-async_list"),
+    path("async/<int:task_id>/", views.AsyncTaskRetrieve.as_view(), name="task-async_retrieve"),
+    path("async/image/<int:pk>/", views.AsyncTaskImageRetrieve.as_view(), name="task_image-async_retrieve"),
 ]
 
 urlpatterns += router.urls
@@ -1,15 +1,27 @@
+from io import BytesIO
+from typing import Callable, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import JsonResponse
+from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
 from rest_framework import views, status, permissions, generics
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.request import HttpRequest
+from rest_framework.request import HttpRequest, Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from common.authentication import aget_request_user
+from common.http import get_not_modified_response, set_conditional_headers
 from common.permissions import IsActive, IsStaffOrReadOnly
-from tasks import serializers, services, models
+from tasks import cache, conditional, lookups, serializers, services, models
 from tasks.filters import TaskFilter
+from tasks.pagination import CompletionCountPagination, TaskCursorPagination, TaskSearchPagination
+from tasks.search import search_tasks
 
 
 class CreateTask(views.APIView):
@@ -21,28 +33,110 @@ class CreateTask(views.APIView):
         return Response(data=serializers.TaskCreateSerializerOut(task).data, status=status.HTTP_201_CREATED)
 
 
+class TaskBulkCreate(views.APIView):
+    permission_classes = [IsActive]
+
+    @swagger_auto_schema(
+        request_body=serializers.TaskBulkCreateSerializerIn(many=True),
+        responses={201: serializers.TaskCreateSerializerOut(many=True)},
+    )
+    def post(self, request: HttpRequest) -> Response:
+        tasks = services.bulk_create_tasks(user=request.user, data=request.data)
+        return Response(data=serializers.TaskCreateSerializerOut(tasks, many=True).data, status=status.HTTP_201_CREATED)
+
+
 class TaskRetrieve(views.APIView):
     permission_classes = [permissions.AllowAny]
 
-    @swagger_auto_schema(responses={200: serializers.TaskRetrieveSerializer()})
+    @swagger_auto_schema(
+        query_serializer=serializers.TaskRetrieveSerializerIn(),
+        responses={200: serializers.TaskRetrieveSerializer()},
+    )
     def get(self, request: HttpRequest, task_id: int) -> Response:
-        task = services.get_task(id_=task_id)
-        serializer_context = {
-            "request": request,
-        }
+        retrieve_serializer = serializers.TaskRetrieveSerializerIn(data=request.query_params)
+        retrieve_serializer.is_valid(raise_exception=True)
+        expand = retrieve_serializer.validated_data.get("expand", "")
+        task = services.get_task_state(id_=task_id)
         if not task.available:
-            if not request.user or request.user.id != task.user.id:
+            if not request.user or request.user.id != task.user_id:
                 raise PermissionDenied(code=403, detail="You aren't allowed")
-        return Response(data=serializers.TaskRetrieveSerializer(task, context=serializer_context).data, status=status.HTTP_200_OK)
+        etag = conditional.get_task_etag(task, expand=expand)
+        not_modified_response = get_not_modified_response(request, etag=etag, last_modified=task.edited_at)
+        if not_modified_response:
+            return not_modified_response
+        data = cache.get_or_set_task_data(request, task, expand, lambda: self.get_task_data(request, task_id, expand))
+        response = Response(data=data, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag=etag, last_modified=task.edited_at)
+
+    def get_task_data(self, request: HttpRequest, task_id: int, expand: str) -> dict:
+        task = services.get_task(id_=task_id, prefetch_images=expand == "images")
+        serializer_class = serializers.TaskExpandedRetrieveSerializer if expand else serializers.TaskRetrieveSerializer
+        return serializer_class(task, context={"request": request}).data
 
 
 class TaskList(generics.ListAPIView):
-    queryset = models.Task.objects.all()
+    queryset = models.Task.objects.select_related("user").filter(available=True)
     serializer_class = serializers.TaskListSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TaskFilter
+    pagination_class = TaskCursorPagination
+    permission_classes = [permissions.AllowAny]
+    cache_responses = True
+
+    def list(self, request: HttpRequest, *args, **kwargs) -> Response:
+        if self.cache_responses and settings.TASK_LIST_CACHE_TTL:
+            page = cache.get_or_set_task_list_page(request, self.get_page_data)
+            return self.get_conditional_response(request, page["etag"], lambda: page["data"])
+        # Uncached, the ETag is computed from the rows so a 304 is returned before serializing them
+        tasks = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_conditional_response(request, self.get_page_etag(tasks), lambda: self.serialize_page(tasks))
+
+    def get_conditional_response(self, request: HttpRequest, etag: str, get_data: Callable[[], dict]) -> Response:
+        not_modified_response = get_not_modified_response(request, etag=etag)
+        if not_modified_response:
+            return not_modified_response
+        return set_conditional_headers(Response(data=get_data()), etag=etag)
+
+    def get_page_etag(self, tasks: List[models.Task]) -> str:
+        return conditional.get_tasks_etag(tasks, self.paginator.get_next_link(), self.paginator.get_previous_link())
+
+    def serialize_page(self, tasks: List[models.Task]) -> dict:
+        return self.get_paginated_response(self.get_serializer(tasks, many=True).data).data
+
+    def get_page_data(self) -> dict:
+        tasks = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return {"data": self.serialize_page(tasks), "etag": self.get_page_etag(tasks)}
+
+
+class TaskMine(TaskList):
+    permission_classes = [permissions.IsAuthenticated]
+    cache_responses = False
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return models.Task.objects.none()
+        return models.Task.objects.select_related("user").filter(user_id=self.request.user.id)
+
+
+class TaskSearch(generics.ListAPIView):
+    queryset = models.Task.objects.select_related("user").filter(available=True)
+    serializer_class = serializers.TaskSearchSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = TaskFilter
+    pagination_class = TaskSearchPagination
     permission_classes = [permissions.AllowAny]
 
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return super().get_queryset().none()
+        search_serializer = serializers.TaskSearchSerializerIn(data=self.request.query_params)
+        search_serializer.is_valid(raise_exception=True)
+        return search_tasks(super().get_queryset(), search_serializer.validated_data["q"])
+
+    @swagger_auto_schema(query_serializer=serializers.TaskSearchSerializerIn())
+    def get(self, request: HttpRequest, *args, **kwargs) -> Response:
+        return super().get(request, *args, **kwargs)
+
 
 class TaskDelete(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -58,8 +152,44 @@ class TaskUpdate(views.APIView):
 
     @swagger_auto_schema(responses={200: serializers.TaskRetrieveSerializer()})
     def put(self, request: HttpRequest, task_id: int) -> Response:
-        task = services.update_task(user=request.user, id_=task_id, data=request.data.copy().dict())
-        return Response(data=serializers.TaskRetrieveSerializer(task).data, status=status.HTTP_200_OK)
+        version = conditional.get_task_version(request.headers.get("If-Match", ""), task_id=task_id)
+        task = services.update_task(user=request.user, id_=task_id, data=request.data, version=version)
+        serializer_context = {
+            "request": request,
+        }
+        response = Response(
+            data=serializers.TaskRetrieveSerializer(task, context=serializer_context).data,
+            status=status.HTTP_200_OK,
+        )
+        return set_conditional_headers(response, etag=conditional.get_task_etag(task), last_modified=task.edited_at)
+
+
+class TaskBulkUpdate(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=serializers.TaskBulkUpdateSerializerIn(many=True),
+        responses={200: serializers.TaskRetrieveSerializer(many=True)},
+    )
+    def put(self, request: HttpRequest) -> Response:
+        tasks = services.bulk_update_tasks(user=request.user, data=request.data)
+        prefetch_related_objects(tasks, "images")
+        serializer_context = {
+            "request": request,
+        }
+        return Response(
+            data=serializers.TaskRetrieveSerializer(tasks, many=True, context=serializer_context).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskBulkDelete(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(request_body=serializers.TaskBulkDeleteSerializerIn(), responses={204: None})
+    def delete(self, request: HttpRequest) -> Response:
+        services.bulk_delete_tasks(user=request.user, data=request.data)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class CategoryViewSet(ModelViewSet):
@@ -80,13 +210,87 @@ class StatusViewSet(ModelViewSet):
     http_method_names = ["get", "post", "head", "put", "delete"]
 
 
+class TaskComplete(views.APIView):
+    permission_classes = [IsActive]
+
+    @swagger_auto_schema(request_body=no_body, responses={201: serializers.TaskCompletionSerializer()})
+    def post(self, request: HttpRequest, task_id: int) -> Response:
+        completion = services.complete_task(user=request.user, id_=task_id)
+        return Response(data=serializers.TaskCompletionSerializer(completion).data, status=status.HTTP_201_CREATED)
+
+
+class TaskUncomplete(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request: HttpRequest, task_id: int) -> Response:
+        services.uncomplete_task(user=request.user, id_=task_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserCompletionCountList(generics.ListAPIView):
+    queryset = models.UserCompletionCount.objects.select_related("user").order_by("-count", "user_id")
+    serializer_class = serializers.UserCompletionCountSerializer
+    pagination_class = CompletionCountPagination
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class CategoryCompletionCountList(generics.ListAPIView):
+    queryset = models.CategoryCompletionCount.objects.order_by("-count", "category_id")
+    serializer_class = serializers.CategoryCompletionCountSerializer
+    pagination_class = CompletionCountPagination
+    permission_classes = [permissions.AllowAny]
+
+
 class TaskImageCreate(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(responses={201: serializers.TaskImageSerializer()})
     def post(self, request: HttpRequest):
-        data = request.data.copy().dict() | request.FILES.copy().dict()
-        task_image = services.create_task_image(user=request.user, data=data)
+        task_image = services.create_task_image(user=request.user, data=request.data)
+        return Response(data=serializers.TaskImageSerializer(task_image).data, status=status.HTTP_201_CREATED)
+
+
+class TaskImageUploadCreate(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=serializers.TaskImageUploadCreateSerializer(),
+        responses={201: serializers.TaskImageUploadSerializer()},
+    )
+    def post(self, request: HttpRequest) -> Response:
+        upload = services.create_task_image_upload(user=request.user, data=request.data)
+        return Response(data=serializers.TaskImageUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class TaskImageUpload(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(responses={200: serializers.TaskImageUploadSerializer()})
+    def get(self, request: HttpRequest, upload_id: str) -> Response:
+        upload = services.get_task_image_upload(user=request.user, upload_id=upload_id)
+        return Response(data=serializers.TaskImageUploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(responses={200: serializers.TaskImageUploadSerializer()})
+    def patch(self, request: HttpRequest, upload_id: str) -> Response:
+        upload = services.append_task_image_upload(
+            user=request.user,
+            upload_id=upload_id,
+            content_range=request.headers.get("Content-Range", ""),
+            stream=request.stream or BytesIO(),
+        )
+        return Response(data=serializers.TaskImageUploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+    def delete(self, request: HttpRequest, upload_id: str) -> Response:
+        services.delete_task_image_upload(user=request.user, upload_id=upload_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskImageUploadComplete(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(responses={201: serializers.TaskImageSerializer()})
+    def post(self, request: HttpRequest, upload_id: str) -> Response:
+        task_image = services.complete_task_image_upload(user=request.user, upload_id=upload_id, data=request.data)
         return Response(data=serializers.TaskImageSerializer(task_image).data, status=status.HTTP_201_CREATED)
 
 
@@ -96,7 +300,13 @@ class TaskImageRetrieve(views.APIView):
     @swagger_auto_schema(responses={201: serializers.TaskImageSerializer()})
     def get(self, request: HttpRequest, pk: int):
         task_image = services.get_task_image(task_image_id=pk)
-        return Response(data=serializers.TaskImageSerializer(task_image).data, status=status.HTTP_200_OK)
+        etag = conditional.get_task_image_etag(task_image)
+        last_modified = conditional.get_task_image_last_modified(task_image)
+        not_modified_response = get_not_modified_response(request, etag=etag, last_modified=last_modified)
+        if not_modified_response:
+            return not_modified_response
+        response = Response(data=serializers.TaskImageSerializer(task_image).data, status=status.HTTP_200_OK)
+        return set_conditional_headers(response, etag=etag, last_modified=last_modified)
 
 
 class TaskImageDelete(views.APIView):
@@ -105,3 +315,59 @@ class TaskImageDelete(views.APIView):
     def delete(self, request: HttpRequest, pk: int):
         services.delete_task_image(task_image_id=pk, user=request.user)
         return Response(status=204)
+
+
+class AsyncTaskRetrieve(View):
+    async def get(self, request: HttpRequest, task_id: int) -> JsonResponse:
+        task = await services.aget_task(id_=task_id)
+        if not task.available:
+            user = await aget_request_user(request)
+            if not user or user.id != task.user_id:
+                return JsonResponse({"detail": "You aren't allowed"}, status=status.HTTP_403_FORBIDDEN)
+        etag = conditional.get_task_etag(task)
+        not_modified_response = get_not_modified_response(request, etag=etag, last_modified=task.edited_at)
+        if not_modified_response:
+            return not_modified_response
+        serializer_context = {
+            "request": request,
+            "lookup_names": await lookups.aget_lookup_names(models.Category, models.Status),
+        }
+        response = JsonResponse(serializers.TaskRetrieveSerializer(task, context=serializer_context).data)
+        return set_conditional_headers(response, etag=etag, last_modified=task.edited_at)
+
+
+class AsyncTaskList(View):
+    async def get(self, request: HttpRequest) -> JsonResponse:
+        task_filter = TaskFilter(request.GET, queryset=TaskList.queryset.all())
+        if not task_filter.is_valid():
+            return JsonResponse(task_filter.errors, status=status.HTTP_400_BAD_REQUEST)
+        paginator = TaskCursorPagination()
+        try:
+            page = await sync_to_async(paginator.paginate_queryset)(task_filter.qs, Request(request))
+        except NotFound as exc:
+            return JsonResponse({"detail": exc.detail}, status=exc.status_code)
+        etag = conditional.get_tasks_etag(page, paginator.get_next_link(), paginator.get_previous_link())
+        not_modified_response = get_not_modified_response(request, etag=etag)
+        if not_modified_response:
+            return not_modified_response
+        serializer_context = {
+            "lookup_names": await lookups.aget_lookup_names(models.Category, models.Status),
+        }
+        response = JsonResponse({
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": serializers.TaskListSerializer(page, many=True, context=serializer_context).data,
+        })
+        return set_conditional_headers(response, etag=etag)
+
+
+class AsyncTaskImageRetrieve(View):
+    async def get(self, request: HttpRequest, pk: int) -> JsonResponse:
+        task_image = await services.aget_task_image(task_image_id=pk)
+        etag = conditional.get_task_image_etag(task_image)
+        last_modified = conditional.get_task_image_last_modified(task_image)
+        not_modified_response = get_not_modified_response(request, etag=etag, last_modified=last_modified)
+        if not_modified_response:
+            return not_modified_response
+        response = JsonResponse(serializers.TaskImageSerializer(task_image).data)
+        return set_conditional_headers(response, etag=etag, last_modified=last_modified)
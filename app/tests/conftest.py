@@ -7,6 +7,7 @@ import pytest
 
 from _pytest.fixtures import SubRequest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 
@@ -18,6 +19,11 @@ from tests import factories
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture(scope="function")
 def admin_user_data() -> dict:
     data = {
@@ -83,7 +89,7 @@ def task(request: SubRequest, admin_user: User, built_task: models.Task) -> mode
 @pytest.fixture(scope="function")
 def tasks(request: SubRequest, admin_user: User, category: models.Category, status: models.Status) -> List[models.Task]:
     fun = partial(factories.TaskFactory.build_batch, user=admin_user, category=category, status=status)
-    if hasattr(request, "param") and request.param is int and request.param > 0:
+    if hasattr(request, "param") and isinstance(request.param, int) and request.param > 0:
         tasks = fun(request.param)
     else:
         tasks = fun(randint(1, 10))
@@ -124,7 +130,7 @@ def built_category() -> models.Category:
 
 @pytest.fixture(scope="function")
 def categories(request: SubRequest, db) -> List[models.Category]:
-    if hasattr(request, "param") and request.param is int and request.param > 0:
+    if hasattr(request, "param") and isinstance(request.param, int) and request.param > 0:
         categories = factories.CategoryFactory.create_batch(request.param)
     else:
         categories = factories.CategoryFactory.create_batch(randint(1, 10))
@@ -139,13 +145,21 @@ def built_status() -> models.Status:
 
 @pytest.fixture(scope="function")
 def statuses(request: SubRequest, db) -> List[models.Status]:
-    if hasattr(request, "param") and request.param is int and request.param > 0:
+    if hasattr(request, "param") and isinstance(request.param, int) and request.param > 0:
         statuses = factories.StatusFactory.create_batch(request.param)
     else:
         statuses = factories.StatusFactory.create_batch(randint(1, 10))
     return statuses
 
 
+@pytest.fixture(scope="function")
+def available_tasks(tasks: List[models.Task]) -> List[models.Task]:
+    models.Task.objects.filter(id__in=[task.id for task in tasks]).update(available=True)
+    for task in tasks:
+        task.available = True
+    return tasks
+
+
 @pytest.fixture(scope="function")
 def built_task_image() -> models.TaskImage:
     task_image = factories.TaskImageFactory.build()
@@ -155,7 +169,7 @@ def built_task_image() -> models.TaskImage:
 @pytest.fixture(scope="function")
 def task_images(request: SubRequest, task: models.Task) -> List[models.TaskImage]:
     fun = partial(factories.TaskImageFactory.build_batch, task=task)
-    if hasattr(request, "param") and request.param is int and request.param > 0:
+    if hasattr(request, "param") and isinstance(request.param, int) and request.param > 0:
         task_images = fun(request.param)
     else:
         task_images = fun(randint(1, 10))
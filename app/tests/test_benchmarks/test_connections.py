@@ -0,0 +1,36 @@
+import os
+import statistics
+import time
+
+import pytest
+from django.db import connection
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS is not set"),
+]
+
+ROUNDS = 50
+
+
+def measure(close_connection: bool) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        if close_connection:
+            connection.close()
+        started_at = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1000
+
+
+class TestConnectionBenchmark:
+    @pytest.mark.django_db(transaction=True)
+    def test_connection_setup(self):
+        new_connection = measure(close_connection=True)
+        persistent_connection = measure(close_connection=False)
+        print(
+            f"\n{connection.vendor}: new connection {new_connection:.3f} ms, "
+            f"persistent connection {persistent_connection:.3f} ms per query"
+        )
@@ -0,0 +1,70 @@
+import os
+import time
+from typing import List
+
+import pytest
+from _pytest.fixtures import SubRequest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks import lookups, models
+
+User = get_user_model()
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS is not set"),
+]
+
+
+@pytest.fixture(scope="function")
+def bulk_tasks(
+        request: SubRequest,
+        admin_user: User,
+        categories: List[models.Category],
+        statuses: List[models.Status]
+) -> int:
+    tasks = [
+        models.Task(
+            title=f"task {number}",
+            text="text",
+            user=admin_user,
+            category=categories[number % len(categories)],
+            status=statuses[number % len(statuses)],
+            available=bool(number % 2),
+        )
+        for number in range(request.param)
+    ]
+    models.Task.objects.bulk_create(tasks, batch_size=5000)
+    return request.param
+
+
+class TestTaskListBenchmark:
+    @pytest.mark.parametrize("bulk_tasks", [10, 1_000, 100_000], indirect=True)
+    def test_task_list(self, test_client: APIClient, bulk_tasks: int):
+        lookups.get_lookup_names(models.Category)
+        lookups.get_lookup_names(models.Status)
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            response = test_client.get(reverse("task-list"))
+            elapsed = time.perf_counter() - started_at
+        assert response.status_code == 200
+        assert len(queries) == 1
+        print(f"\ntask-list: {bulk_tasks} tasks, {len(queries)} queries, {elapsed * 1000:.1f} ms")
+
+
+class TestTaskSearchBenchmark:
+    @pytest.mark.parametrize("bulk_tasks", [1_000, 100_000, 1_000_000], indirect=True)
+    def test_task_search(self, test_client: APIClient, bulk_tasks: int):
+        number = bulk_tasks // 2 + 1
+        test_client.get(reverse("task-search"), {"q": "warm up"})
+        started_at = time.perf_counter()
+        response = test_client.get(reverse("task-search"), {"q": f"task {number}"})
+        elapsed = time.perf_counter() - started_at
+        assert response.status_code == 200
+        assert f"task {number}" in [task["title"] for task in response.data["results"]]
+        print(f"\ntask-search: {bulk_tasks} tasks, {elapsed * 1000:.1f} ms")
+        assert elapsed < 0.05
@@ -0,0 +1,96 @@
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_SENDFILE = ""
+    (tmp_path / "taskimage").mkdir()
+    (tmp_path / "taskimage" / "image.jpg").write_bytes(CONTENT)
+    (tmp_path / "avatar.png").write_bytes(CONTENT)
+    return tmp_path
+
+
+def get_content(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+class TestMedia:
+    def test_success(self, test_client: APIClient):
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]))
+        assert response.status_code == 200
+        assert get_content(response) == CONTENT
+        assert response.headers["Content-Type"] == "image/jpeg"
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_not_content_addressed(self, test_client: APIClient, settings):
+        response = test_client.get(reverse("media", args=["avatar.png"]))
+        assert response.headers["Cache-Control"] == f"public, max-age={settings.MEDIA_MAX_AGE}"
+
+    def test_not_modified(self, test_client: APIClient):
+        url = reverse("media", args=["taskimage/image.jpg"])
+        response = test_client.get(url)
+        response = test_client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
+    def test_not_modified_since(self, test_client: APIClient):
+        url = reverse("media", args=["taskimage/image.jpg"])
+        response = test_client.get(url, HTTP_IF_MODIFIED_SINCE=test_client.get(url).headers["Last-Modified"])
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize(
+        "header, first, last",
+        [("bytes=0-9", 0, 9), ("bytes=1000-", 1000, 1023), ("bytes=-24", 1000, 1023), ("bytes=1000-5000", 1000, 1023)],
+    )
+    def test_range(self, test_client: APIClient, header: str, first: int, last: int):
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]), HTTP_RANGE=header)
+        assert response.status_code == 206
+        assert get_content(response) == CONTENT[first:last + 1]
+        assert response.headers["Content-Range"] == f"bytes {first}-{last}/{len(CONTENT)}"
+        assert response.headers["Content-Length"] == str(last - first + 1)
+
+    def test_unsatisfiable_range(self, test_client: APIClient):
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]), HTTP_RANGE="bytes=2000-")
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+    def test_stale_if_range(self, test_client: APIClient):
+        response = test_client.get(
+            reverse("media", args=["taskimage/image.jpg"]), HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+        )
+        assert response.status_code == 200
+        assert get_content(response) == CONTENT
+
+    def test_fresh_if_range(self, test_client: APIClient):
+        url = reverse("media", args=["taskimage/image.jpg"])
+        etag = test_client.get(url).headers["ETag"]
+        response = test_client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        assert response.status_code == 206
+
+    def test_x_accel_redirect(self, test_client: APIClient, settings):
+        settings.MEDIA_SENDFILE = "nginx"
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]))
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == "/protected-media/taskimage/image.jpg"
+        assert response.content == b""
+
+    def test_x_sendfile(self, test_client: APIClient, settings, media_root):
+        settings.MEDIA_SENDFILE = "xsendfile"
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]))
+        assert response.headers["X-Sendfile"] == str(media_root / "taskimage" / "image.jpg")
+
+    @pytest.mark.parametrize("path", ["missing.jpg", "taskimage", "../secret.txt"])
+    def test_not_exists(self, test_client: APIClient, path: str):
+        response = test_client.get(reverse("media", args=[path]))
+        assert response.status_code == 404
+
+    def test_modified_date_format(self, test_client: APIClient, media_root):
+        response = test_client.get(reverse("media", args=["taskimage/image.jpg"]))
+        modified_at = (media_root / "taskimage" / "image.jpg").stat().st_mtime
+        assert response.headers["Last-Modified"] == http_date(int(modified_at))
@@ -2,12 +2,18 @@ import random
 from typing import List
 
 import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
 from django.forms import model_to_dict
 from django.urls import reverse
 from rest_framework.test import APIClient
 
-from tasks import models, serializers
+from jobs import worker
+from tasks import cache as task_cache
+from tasks import models, serializers, services
 
 User = get_user_model()
 
@@ -57,31 +63,122 @@ class TestTaskRetrieve:
         response = client.get(reverse("task-retrieve", kwargs={"task_id": task.id}))
         assert response.status_code == 403
 
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_owner_num_queries(self, task: models.Task, admin_test_client: APIClient, django_assert_num_queries):
+        url = reverse("task-retrieve", kwargs={"task_id": task.id})
+        admin_test_client.get(url)
+        with django_assert_num_queries(1):
+            response = admin_test_client.get(url)
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("task_images", [50], indirect=True)
+    def test_expand_images(
+            self,
+            task_images: List[models.TaskImage],
+            admin_test_client: APIClient,
+            django_assert_num_queries
+    ):
+        url = f"{reverse('task-retrieve', kwargs={'task_id': task_images[0].task_id})}?expand=images"
+        admin_test_client.get(url)
+        models.Task.objects.filter(id=task_images[0].task_id).update(version=F("version") + 1)
+        with django_assert_num_queries(3):
+            response = admin_test_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data["images"]) == 50
+        with django_assert_num_queries(1):
+            assert admin_test_client.get(url).data == response.data
+        assert set(response.data["images"][0]) == {"id", "title", "image", "status", "variants"}
+
+    def test_expand_changes_etag(self, task_images: List[models.TaskImage], admin_test_client: APIClient):
+        url = reverse("task-retrieve", kwargs={"task_id": task_images[0].task_id})
+        etag = admin_test_client.get(url).headers["ETag"]
+        response = admin_test_client.get(f"{url}?expand=images", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert isinstance(response.data["images"][0], dict)
+
+    def test_cached_category_rename(self, task: models.Task, admin_test_client: APIClient):
+        url = reverse("task-retrieve", kwargs={"task_id": task.id})
+        admin_test_client.get(url)
+        task.category.name = "renamed"
+        task.category.save()
+        assert admin_test_client.get(url).data["category"] == "renamed"
+
+    def test_cached_image_delete(self, task_images: List[models.TaskImage], admin_test_client: APIClient):
+        url = f"{reverse('task-retrieve', kwargs={'task_id': task_images[0].task_id})}?expand=images"
+        admin_test_client.get(url)
+        task_images[0].delete()
+        assert len(admin_test_client.get(url).data["images"]) == len(task_images) - 1
+
+    def test_cached_image_processed(
+            self, admin_test_client: APIClient,
+            task: models.Task,
+            built_task_image: models.TaskImage
+    ):
+        data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
+        data_for_create["task"] = task.id
+        admin_test_client.post(reverse("task_image-create"), data_for_create)
+        url = f"{reverse('task-retrieve', kwargs={'task_id': task.id})}?expand=images"
+        assert admin_test_client.get(url).data["images"][0]["status"] == models.TaskImage.Status.PENDING
+        worker.run_pending()
+        assert admin_test_client.get(url).data["images"][0]["status"] == models.TaskImage.Status.READY
+
+    def test_expand_invalid(self, task: models.Task, admin_test_client: APIClient):
+        response = admin_test_client.get(f"{reverse('task-retrieve', kwargs={'task_id': task.id})}?expand=user")
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("task", [{"available": True}], indirect=True)
+    def test_not_modified(self, task: models.Task, test_client: APIClient):
+        url = reverse("task-retrieve", kwargs={"task_id": task.id})
+        response = test_client.get(url)
+        assert response.status_code == 200
+        assert response.headers["Last-Modified"]
+        response = test_client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize("task", [{"available": True}], indirect=True)
+    def test_modified_after_update(self, task: models.Task, test_client: APIClient, admin_test_client: APIClient):
+        url = reverse("task-retrieve", kwargs={"task_id": task.id})
+        etag = test_client.get(url).headers["ETag"]
+        admin_test_client.put(reverse("task-update", kwargs={"task_id": task.id}), {"title": "another"})
+        response = test_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["title"] == "another"
+
 
 class TestTaskList:
-    def test_success(self, admin_test_client, tasks: List[models.Task]):
+    @pytest.fixture
+    def built_task(self, built_task: models.Task) -> models.Task:
+        built_task.available = True
+        return built_task
+
+    def test_success(self, admin_test_client, available_tasks: List[models.Task]):
         response = admin_test_client.get(reverse("task-list"))
         assert response.status_code == 200
-        assert len(response.data) == len(tasks)
+        assert len(response.data["results"]) == len(available_tasks)
 
-    def test_success_not_auth_user(self, test_client: APIClient, tasks: List[models.Task]):
+    def test_success_not_auth_user(self, test_client: APIClient, available_tasks: List[models.Task]):
         response = test_client.get(reverse("task-list"))
         assert response.status_code == 200
-        assert len(response.data) == len(tasks)
+        assert len(response.data["results"]) == len(available_tasks)
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_not_available_excluded(self, admin_test_client, task: models.Task):
+        response = admin_test_client.get(reverse("task-list"))
+        assert response.status_code == 200
+        assert response.data["results"] == []
 
     def test_available_is_true(self, admin_test_client, tasks: List[models.Task]):
         available_tasks = list(filter(lambda obj: obj.available is True, tasks))
         response = admin_test_client.get(f"{reverse('task-list')}?available=true")
         assert response.status_code == 200
-        assert len(response.data) == len(available_tasks)
-        assert all(task["available"] for task in response.data)
+        assert len(response.data["results"]) == len(available_tasks)
+        assert all(task["available"] for task in response.data["results"])
 
     def test_available_is_false(self, admin_test_client, tasks: List[models.Task]):
-        available_tasks = list(filter(lambda obj: obj.available is False, tasks))
         response = admin_test_client.get(f"{reverse('task-list')}?available=false")
         assert response.status_code == 200
-        assert len(response.data) == len(available_tasks)
-        assert not all(task["available"] for task in response.data)
+        assert len(response.data["results"]) == 0
 
     def test_category_filter(
             self,
@@ -95,7 +192,7 @@ class TestTaskList:
         built_task.save()
         response = admin_test_client.get(f"{reverse('task-list')}?category__name=category")
         assert response.status_code == 200
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
 
     def test_status_filter(
             self,
@@ -109,12 +206,454 @@ class TestTaskList:
         built_task.save()
         response = admin_test_client.get(f"{reverse('task-list')}?status__name=status")
         assert response.status_code == 200
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
+
+    def test_category_id_filter(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            tasks: List[models.Task],
+            built_task: models.Task
+    ):
+        built_task.category = models.Category.objects.create(name="category")
+        built_task.user = admin_user
+        built_task.save()
+        response = test_client.get(f"{reverse('task-list')}?category={built_task.category.id}")
+        assert response.status_code == 200
+        assert [task["id"] for task in response.data["results"]] == [built_task.id]
+
+    def test_category_id_in_filter(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            available_tasks: List[models.Task],
+            built_task: models.Task
+    ):
+        built_task.category = models.Category.objects.create(name="category")
+        built_task.user = admin_user
+        built_task.save()
+        category_ids = f"{built_task.category.id},{available_tasks[0].category.id}"
+        response = test_client.get(f"{reverse('task-list')}?category__in={category_ids}")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == len(available_tasks) + 1
+
+    def test_status_id_in_filter(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            tasks: List[models.Task],
+            built_task: models.Task
+    ):
+        built_task.status = models.Status.objects.create(name="status")
+        built_task.user = admin_user
+        built_task.save()
+        response = test_client.get(f"{reverse('task-list')}?status__in={built_task.status.id}")
+        assert response.status_code == 200
+        assert [task["id"] for task in response.data["results"]] == [built_task.id]
+
+    def test_category_name_exact_filter(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            tasks: List[models.Task],
+            built_task: models.Task
+    ):
+        built_task.category = models.Category.objects.create(name="category")
+        built_task.user = admin_user
+        built_task.save()
+        response = test_client.get(f"{reverse('task-list')}?category__name__exact=category")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 1
+        response = test_client.get(f"{reverse('task-list')}?category__name__exact=categ")
+        assert len(response.data["results"]) == 0
+
+    def test_status_name_istartswith_filter(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            tasks: List[models.Task],
+            built_task: models.Task
+    ):
+        built_task.status = models.Status.objects.create(name="status")
+        built_task.user = admin_user
+        built_task.save()
+        response = test_client.get(f"{reverse('task-list')}?status__name__istartswith=STAT")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 1
 
     def test_not_exist(self, admin_test_client):
         response = admin_test_client.get(reverse("task-list"))
         assert response.status_code == 200
-        assert len(response.data) == 0
+        assert len(response.data["results"]) == 0
+
+    @pytest.mark.parametrize("tasks", [10], indirect=True)
+    def test_query_count(
+            self,
+            test_client: APIClient,
+            available_tasks: List[models.Task],
+            django_assert_num_queries
+    ):
+        test_client.get(reverse("task-list"))
+        task_cache.invalidate_task_list()
+        with django_assert_num_queries(1):
+            response = test_client.get(reverse("task-list"))
+        assert response.status_code == 200
+        assert len(response.data["results"]) == len(available_tasks)
+
+    def test_cached(self, test_client: APIClient, available_tasks: List[models.Task], django_assert_num_queries):
+        response = test_client.get(f"{reverse('task-list')}?status__in=&available=true&category__name=")
+        with django_assert_num_queries(0):
+            cached_response = test_client.get(f"{reverse('task-list')}?available=true")
+        assert cached_response.data == response.data
+        assert cached_response.headers["ETag"] == response.headers["ETag"]
+        with django_assert_num_queries(0):
+            response = test_client.get(f"{reverse('task-list')}?available=true", HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
+    def test_not_modified_without_serializing(
+            self, settings, test_client: APIClient, available_tasks: List[models.Task], monkeypatch
+    ):
+        settings.TASK_LIST_CACHE_TTL = 0
+        etag = test_client.get(reverse("task-list")).headers["ETag"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("The page was serialized")
+
+        monkeypatch.setattr(serializers.TaskListSerializer, "to_representation", fail)
+        response = test_client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_not_cached_without_ttl(
+            self, settings, test_client: APIClient, available_tasks: List[models.Task], django_assert_num_queries
+    ):
+        settings.TASK_LIST_CACHE_TTL = 0
+        test_client.get(reverse("task-list"))
+        with django_assert_num_queries(1):
+            response = test_client.get(reverse("task-list"))
+        assert len(response.data["results"]) == len(available_tasks)
+
+    def assert_invalidated(self, client: APIClient, write):
+        client.get(reverse("task-list"))
+        write()
+        response = client.get(reverse("task-list"))
+        cache.clear()
+        assert response.data == client.get(reverse("task-list")).data
+
+    def test_invalidated_on_task_save(self, test_client: APIClient, available_tasks: List[models.Task]):
+        task = available_tasks[0]
+        task.available = False
+        self.assert_invalidated(test_client, task.save)
+
+    def test_invalidated_on_task_delete(self, test_client: APIClient, available_tasks: List[models.Task]):
+        self.assert_invalidated(test_client, available_tasks[0].delete)
+
+    def test_invalidated_on_category_save(self, test_client: APIClient, available_tasks: List[models.Task]):
+        category = available_tasks[0].category
+        category.name = "renamed"
+        self.assert_invalidated(test_client, category.save)
+
+    def test_invalidated_on_status_save(self, test_client: APIClient, available_tasks: List[models.Task]):
+        status = available_tasks[0].status
+        status.name = "renamed"
+        self.assert_invalidated(test_client, status.save)
+
+    def test_invalidated_on_username_change(self, test_client: APIClient, available_tasks: List[models.Task]):
+        user = available_tasks[0].user
+        user.username = "renamed"
+        self.assert_invalidated(test_client, user.save)
+
+    def test_invalidated_on_set_username(
+            self, test_client: APIClient, admin_test_client: APIClient, available_tasks: List[models.Task]
+    ):
+        data = {"new_username": "renamed", "current_password": settings.ADMIN_FIXTURE_PASSWORD}
+
+        def set_username():
+            assert admin_test_client.post(reverse("user-set-username"), data).status_code == 204
+
+        self.assert_invalidated(test_client, set_username)
+        assert "renamed" in {task["user"] for task in test_client.get(reverse("task-list")).data["results"]}
+
+    def test_invalidated_on_bulk_create(self, test_client: APIClient, available_tasks: List[models.Task]):
+        task = available_tasks[0]
+        data = [{"title": "title", "category": task.category_id, "status": task.status_id, "text": "text", "available": True}]
+        self.assert_invalidated(test_client, lambda: services.bulk_create_tasks(user=task.user, data=data))
+
+    def test_invalidated_on_update(self, test_client: APIClient, available_tasks: List[models.Task]):
+        task = available_tasks[0]
+        self.assert_invalidated(
+            test_client,
+            lambda: services.update_task(user=task.user, id_=task.id, data={"available": False}),
+        )
+
+    def test_mine_not_cached(self, user_test_client: APIClient, admin_test_client: APIClient, tasks: List[models.Task]):
+        assert len(admin_test_client.get(reverse("task-mine")).data["results"]) == len(tasks)
+        assert user_test_client.get(reverse("task-mine")).data["results"] == []
+
+    @pytest.mark.parametrize("tasks", [7], indirect=True)
+    def test_cursor_pagination(self, test_client: APIClient, available_tasks: List[models.Task]):
+        url = f"{reverse('task-list')}?page_size=3"
+        task_ids = []
+        while url:
+            response = test_client.get(url)
+            assert response.status_code == 200
+            assert "count" not in response.data
+            task_ids.extend(task["id"] for task in response.data["results"])
+            url = response.data["next"]
+        assert task_ids == sorted(task_ids, reverse=True)
+        assert set(task_ids) == set(models.Task.objects.values_list("id", flat=True))
+
+    def test_not_modified(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.get(reverse("task-list"))
+        assert response.status_code == 200
+        response = test_client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
+    def test_modified_after_delete(self, test_client: APIClient, available_tasks: List[models.Task]):
+        etag = test_client.get(reverse("task-list")).headers["ETag"]
+        models.Task.objects.filter(id=random.choice(available_tasks).id).delete()
+        response = test_client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(response.data["results"]) == len(available_tasks) - 1
+
+    def test_without_last_modified(self, test_client: APIClient, available_tasks: List[models.Task]):
+        response = test_client.get(reverse("task-list"))
+        assert "Last-Modified" not in response.headers
+        models.Task.objects.filter(id=available_tasks[0].id).delete()
+        response = test_client.get(reverse("task-list"), HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        assert response.status_code == 200
+
+    def test_modified_after_username_change(self, test_client: APIClient, available_tasks: List[models.Task]):
+        etag = test_client.get(reverse("task-list")).headers["ETag"]
+        user = available_tasks[0].user
+        user.username = "renamed"
+        user.save()
+        response = test_client.get(reverse("task-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert "renamed" in {task["user"] for task in response.data["results"]}
+
+
+class TestTaskMine:
+    def test_success(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        response = admin_test_client.get(reverse("task-mine"))
+        assert response.status_code == 200
+        assert {task["id"] for task in response.data["results"]} == {task.id for task in tasks}
+
+    def test_other_users_tasks_excluded(self, user_test_client: APIClient, tasks: List[models.Task]):
+        response = user_test_client.get(reverse("task-mine"))
+        assert response.status_code == 200
+        assert response.data["results"] == []
+
+    def test_available_filter(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        response = admin_test_client.get(f"{reverse('task-mine')}?available=false")
+        assert {task["id"] for task in response.data["results"]} == {task.id for task in tasks if not task.available}
+
+    @pytest.mark.parametrize("tasks", [7], indirect=True)
+    def test_cursor_pagination(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        url = f"{reverse('task-mine')}?page_size=3"
+        task_ids = []
+        while url:
+            response = admin_test_client.get(url)
+            task_ids.extend(task["id"] for task in response.data["results"])
+            url = response.data["next"]
+        assert task_ids == sorted(task_ids, reverse=True)
+        assert set(task_ids) == {task.id for task in tasks}
+
+    def test_not_auth_user(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.get(reverse("task-mine"))
+        assert response.status_code == 401
+
+
+class TestTaskComplete:
+    def test_success(self, admin_test_client: APIClient, admin_user: User, task: models.Task):
+        response = admin_test_client.post(reverse("task-complete", args=[task.id]))
+        assert response.status_code == 201
+        assert (response.data["task"], response.data["user"]) == (task.id, admin_user.id)
+
+    def test_already_completed(self, admin_test_client: APIClient, task: models.Task):
+        admin_test_client.post(reverse("task-complete", args=[task.id]))
+        response = admin_test_client.post(reverse("task-complete", args=[task.id]))
+        assert response.status_code == 409
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_not_available(self, user_test_client: APIClient, task: models.Task):
+        response = user_test_client.post(reverse("task-complete", args=[task.id]))
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_not_available_num_queries(self, user_test_client: APIClient, task: models.Task, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            user_test_client.post(reverse("task-complete", args=[task.id]))
+
+    def test_uncomplete_not_author(self, admin_test_client: APIClient, user_test_client: APIClient, task: models.Task):
+        admin_test_client.post(reverse("task-complete", args=[task.id]))
+        response = user_test_client.delete(reverse("task-uncomplete", args=[task.id]))
+        assert response.status_code == 403
+
+    def test_uncomplete(self, admin_test_client: APIClient, task: models.Task):
+        admin_test_client.post(reverse("task-complete", args=[task.id]))
+        response = admin_test_client.delete(reverse("task-uncomplete", args=[task.id]))
+        assert response.status_code == 204
+        assert not models.TaskCompletion.objects.exists()
+
+    def test_not_auth_user(self, test_client: APIClient, task: models.Task):
+        response = test_client.post(reverse("task-complete", args=[task.id]))
+        assert response.status_code == 401
+
+
+class TestCompletionCounts:
+    def test_users(self, admin_test_client: APIClient, admin_user: User, tasks: List[models.Task]):
+        for task in tasks:
+            admin_test_client.post(reverse("task-complete", args=[task.id]))
+        response = admin_test_client.get(reverse("completion_count-users"))
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {"user": admin_user.id, "username": admin_user.username, "count": len(tasks)}
+        ]
+
+    def test_categories(self, admin_test_client: APIClient, test_client: APIClient, tasks: List[models.Task]):
+        for task in tasks:
+            admin_test_client.post(reverse("task-complete", args=[task.id]))
+        category = tasks[0].category
+        response = test_client.get(reverse("completion_count-categories"))
+        assert response.status_code == 200
+        assert response.data["results"] == [{"category": category.id, "name": category.name, "count": len(tasks)}]
+
+    @pytest.mark.parametrize("tasks", [10], indirect=True)
+    def test_query_count(
+            self,
+            test_client: APIClient,
+            admin_user: User,
+            tasks: List[models.Task],
+            django_assert_num_queries
+    ):
+        for task in tasks:
+            services.complete_task(user=admin_user, id_=task.id)
+        test_client.get(reverse("completion_count-categories"))
+        with django_assert_num_queries(2):
+            test_client.get(reverse("completion_count-categories"))
+
+
+class TestAsyncTaskRetrieve:
+    def test_success(self, task: models.Task, admin_test_client: APIClient):
+        response = admin_test_client.get(reverse("task-async_retrieve", kwargs={"task_id": task.id}))
+        assert response.status_code == 200
+        assert response.json()["id"] == task.id
+        assert response.json()["category"] == task.category.name
+
+    def test_not_exist(self, db, test_client: APIClient):
+        response = test_client.get(reverse("task-async_retrieve", kwargs={"task_id": random.randint(1, 10)}))
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_task_available_false_not_auth_user(self, task: models.Task, test_client: APIClient):
+        response = test_client.get(reverse("task-async_retrieve", kwargs={"task_id": task.id}))
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_task_available_false_author(self, task: models.Task, admin_test_client: APIClient):
+        response = admin_test_client.get(reverse("task-async_retrieve", kwargs={"task_id": task.id}))
+        assert response.status_code == 200
+
+    def test_with_images(self, task_images: List[models.TaskImage], test_client: APIClient):
+        task = task_images[0].task
+        task.available = True
+        task.save()
+        response = test_client.get(reverse("task-async_retrieve", kwargs={"task_id": task.id}))
+        assert response.status_code == 200
+        assert len(response.json()["images"]) == len(task_images)
+
+
+class TestAsyncTaskList:
+    def test_success(self, test_client: APIClient, available_tasks: List[models.Task]):
+        response = test_client.get(reverse("task-async_list"))
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == len(available_tasks)
+
+    def test_filter(self, test_client: APIClient, tasks: List[models.Task]):
+        available_tasks = list(filter(lambda obj: obj.available is True, tasks))
+        response = test_client.get(f"{reverse('task-async_list')}?available=true")
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == len(available_tasks)
+
+    @pytest.mark.parametrize("tasks", [7], indirect=True)
+    def test_cursor_pagination(self, test_client: APIClient, available_tasks: List[models.Task]):
+        response = test_client.get(f"{reverse('task-async_list')}?page_size=5")
+        assert len(response.json()["results"]) == 5
+        response = test_client.get(response.json()["next"])
+        assert len(response.json()["results"]) == 2
+
+    def test_invalid_cursor(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.get(f"{reverse('task-async_list')}?cursor=garbage")
+        assert response.status_code == 404
+        assert response.json()["detail"]
+
+    def test_not_modified(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.get(reverse("task-async_list"))
+        response = test_client.get(reverse("task-async_list"), HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
+
+class TestAsyncTaskImageRetrieve:
+    def test_success(self, test_client: APIClient, task_images: List[models.TaskImage]):
+        task_image = random.choice(task_images)
+        response = test_client.get(reverse("task_image-async_retrieve", args=[task_image.id]))
+        assert response.status_code == 200
+        assert (response.json()["id"], response.json()["title"]) == (task_image.id, task_image.title)
+
+    def test_not_exists(self, db, test_client: APIClient):
+        response = test_client.get(reverse("task_image-async_retrieve", args=[1]))
+        assert response.status_code == 404
+
+
+class TestTaskSearch:
+    @pytest.fixture
+    def search_tasks(self, admin_user: User, category: models.Category, status: models.Status) -> List[models.Task]:
+        return [
+            models.Task.objects.create(
+                title=title, text=text, user=admin_user, category=category, status=status, available=available
+            )
+            for title, text, available in [
+                ("Buy groceries", "milk and bread", True),
+                ("Write report", "quarterly groceries budget", True),
+                ("Walk the dog", "around the park", True),
+                ("Buy groceries secretly", "hidden", False),
+            ]
+        ]
+
+    def test_success(self, test_client: APIClient, search_tasks: List[models.Task]):
+        response = test_client.get(reverse("task-search"), {"q": "groceries"})
+        assert response.status_code == 200
+        assert [task["id"] for task in response.data["results"]] == [search_tasks[0].id, search_tasks[1].id]
+        assert response.data["results"][0]["title"] == "Buy groceries"
+
+    def test_all_terms(self, test_client: APIClient, search_tasks: List[models.Task]):
+        response = test_client.get(reverse("task-search"), {"q": "groceries budget"})
+        assert [task["id"] for task in response.data["results"]] == [search_tasks[1].id]
+
+    def test_updated_task(self, test_client: APIClient, search_tasks: List[models.Task]):
+        task = search_tasks[2]
+        task.title = "Walk the cat"
+        task.save()
+        assert test_client.get(reverse("task-search"), {"q": "dog"}).data["count"] == 0
+        response = test_client.get(reverse("task-search"), {"q": "cat"})
+        assert [task["id"] for task in response.data["results"]] == [task.id]
+
+    def test_deleted_task(self, test_client: APIClient, search_tasks: List[models.Task]):
+        search_tasks[0].delete()
+        response = test_client.get(reverse("task-search"), {"q": "groceries"})
+        assert [task["id"] for task in response.data["results"]] == [search_tasks[1].id]
+
+    def test_with_filter(self, test_client: APIClient, search_tasks: List[models.Task], category: models.Category):
+        response = test_client.get(reverse("task-search"), {"q": "groceries", "category": category.id + 1})
+        assert response.data["count"] == 0
+
+    def test_syntax_characters(self, test_client: APIClient, search_tasks: List[models.Task]):
+        response = test_client.get(reverse("task-search"), {"q": '"groceries AND ("'})
+        assert response.status_code == 200
+
+    def test_without_query(self, test_client: APIClient, db):
+        response = test_client.get(reverse("task-search"))
+        assert response.status_code == 400
 
 
 class TestDeleteTask:
@@ -135,6 +674,10 @@ class TestDeleteTask:
         response = user_test_client.delete(reverse("task-delete", kwargs={"task_id": task.id}))
         assert response.status_code == 404
 
+    def test_with_not_author_num_queries(self, user_test_client: APIClient, task: models.Task, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            user_test_client.delete(reverse("task-delete", kwargs={"task_id": task.id}))
+
     @pytest.mark.parametrize("tasks", [7], indirect=True)
     def test_not_exist_task(self, admin_test_client, tasks: List[models.Task]):
         response = admin_test_client.delete(reverse("task-delete", kwargs={"task_id": 100}))
@@ -156,6 +699,12 @@ class TestTaskUpdate:
         assert response.status_code == 200
         assert response.data["title"] == data_for_update["title"] and response.data["available"] == data_for_update["available"]
 
+    def test_with_images(self, admin_test_client, task: models.Task, task_images: List[models.TaskImage]):
+        response = admin_test_client.put(reverse("task-update", kwargs={"task_id": task.id}), {"title": "another"})
+        assert response.status_code == 200
+        assert len(response.data["images"]) == len(task_images)
+        assert response.data["images"][0].startswith("http://testserver/")
+
     def test_with_multiple_tasks(self, admin_test_client, tasks: List[models.Task]):
         data_for_update = {"title": "another", "available": False}
         response = admin_test_client.put(
@@ -181,6 +730,41 @@ class TestTaskUpdate:
         )
         assert response.status_code == 403
 
+    def test_not_author_num_queries(self, user_test_client: APIClient, task: models.Task, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = user_test_client.put(reverse("task-update", kwargs={"task_id": task.id}), {"title": "another"})
+        assert response.status_code == 403
+
+    def test_if_match(self, admin_test_client: APIClient, task: models.Task):
+        etag = admin_test_client.get(reverse("task-retrieve", kwargs={"task_id": task.id})).headers["ETag"]
+        response = admin_test_client.put(
+            reverse("task-update", kwargs={"task_id": task.id}),
+            {"title": "another"},
+            HTTP_IF_MATCH=etag,
+        )
+        assert response.status_code == 200
+        assert response.data["version"] == task.version + 1
+        assert response.headers["ETag"] != etag
+
+    def test_if_match_conflict(self, admin_test_client: APIClient, task: models.Task):
+        etag = admin_test_client.get(reverse("task-retrieve", kwargs={"task_id": task.id})).headers["ETag"]
+        admin_test_client.put(reverse("task-update", kwargs={"task_id": task.id}), {"title": "first"}, HTTP_IF_MATCH=etag)
+        response = admin_test_client.put(
+            reverse("task-update", kwargs={"task_id": task.id}),
+            {"title": "second"},
+            HTTP_IF_MATCH=etag,
+        )
+        assert response.status_code == 412
+        assert models.Task.objects.get(id=task.id).title == "first"
+
+    def test_if_match_malformed(self, admin_test_client: APIClient, task: models.Task):
+        response = admin_test_client.put(
+            reverse("task-update", kwargs={"task_id": task.id}),
+            {"title": "another"},
+            HTTP_IF_MATCH='"malformed"',
+        )
+        assert response.status_code == 412
+
     def test_not_exist_task(self, admin_test_client):
         data_for_update = {"title": "another", "available": False}
         response = admin_test_client.put(
@@ -198,6 +782,88 @@ class TestTaskUpdate:
         assert response.status_code == 401
 
 
+class TestTaskBulkCreate:
+    def test_success(self, admin_test_client: APIClient, category: models.Category, status: models.Status):
+        data = [
+            {"title": f"title {number}", "category": category.id, "status": status.id, "text": "text", "available": True}
+            for number in range(5)
+        ]
+        response = admin_test_client.post(reverse("task-bulk_create"), data, format="json")
+        assert response.status_code == 201
+        assert len(response.data) == len(data)
+        assert all(task["id"] for task in response.data)
+        assert models.Task.objects.count() == len(data)
+
+    def test_per_item_errors(self, admin_test_client: APIClient, category: models.Category, status: models.Status):
+        data = [
+            {"title": "title", "category": category.id, "status": status.id, "text": "text"},
+            {"title": "title", "category": category.id + 100, "status": status.id, "text": "text"},
+        ]
+        response = admin_test_client.post(reverse("task-bulk_create"), data, format="json")
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert "category" in response.data[1]
+        assert not models.Task.objects.exists()
+
+    def test_not_list(self, admin_test_client: APIClient, category: models.Category, status: models.Status):
+        data = {"title": "title", "category": category.id, "status": status.id, "text": "text"}
+        response = admin_test_client.post(reverse("task-bulk_create"), data, format="json")
+        assert response.status_code == 400
+
+    def test_not_auth(self, test_client: APIClient):
+        response = test_client.post(reverse("task-bulk_create"), [], format="json")
+        assert response.status_code == 401
+
+
+class TestTaskBulkUpdate:
+    def test_success(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        data = [{"id": task.id, "title": "another", "available": False} for task in tasks]
+        response = admin_test_client.put(reverse("task-bulk_update"), data, format="json")
+        assert response.status_code == 200
+        assert all(task["title"] == "another" and task["available"] is False for task in response.data)
+        assert models.Task.objects.filter(title="another", available=False).count() == len(tasks)
+
+    def test_not_author(self, user_test_client: APIClient, tasks: List[models.Task]):
+        data = [{"id": task.id, "title": "another"} for task in tasks]
+        response = user_test_client.put(reverse("task-bulk_update"), data, format="json")
+        assert response.status_code == 400
+        assert not models.Task.objects.filter(title="another").exists()
+
+    def test_invalid_data(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        data = [{"id": task.id, "title": "a" * 300} for task in tasks]
+        response = admin_test_client.put(reverse("task-bulk_update"), data, format="json")
+        assert response.status_code == 400
+
+    def test_without_auth(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.put(reverse("task-bulk_update"), [{"id": tasks[0].id}], format="json")
+        assert response.status_code == 401
+
+
+class TestTaskBulkDelete:
+    def test_success(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        data = {"ids": [task.id for task in tasks]}
+        response = admin_test_client.delete(reverse("task-bulk_delete"), data, format="json")
+        assert response.status_code == 204
+        assert not models.Task.objects.exists()
+
+    def test_not_exist_task(self, admin_test_client: APIClient, tasks: List[models.Task]):
+        data = {"ids": [tasks[0].id, 1000]}
+        response = admin_test_client.delete(reverse("task-bulk_delete"), data, format="json")
+        assert response.status_code == 400
+        assert response.data["ids"][1]
+        assert models.Task.objects.count() == len(tasks)
+
+    def test_not_author(self, user_test_client: APIClient, tasks: List[models.Task]):
+        data = {"ids": [task.id for task in tasks]}
+        response = user_test_client.delete(reverse("task-bulk_delete"), data, format="json")
+        assert response.status_code == 400
+        assert models.Task.objects.count() == len(tasks)
+
+    def test_without_auth(self, test_client: APIClient, tasks: List[models.Task]):
+        response = test_client.delete(reverse("task-bulk_delete"), {"ids": [tasks[0].id]}, format="json")
+        assert response.status_code == 401
+
+
 class TestCreateCategory:
     def test_success(self, admin_test_client: APIClient, built_category: models.Category):
         response = admin_test_client.post(reverse("category-list"), {"name": built_category.name})
@@ -446,6 +1112,22 @@ class TestCreateTaskImage:
         response_data = response.data
         assert response_data
         assert response_data["id"]
+        assert response_data["status"] == models.TaskImage.Status.PENDING
+
+    def test_processed_in_background(
+            self, admin_test_client: APIClient,
+            task: models.Task,
+            built_task_image: models.TaskImage
+    ):
+        data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
+        data_for_create["task"] = task.id
+        response = admin_test_client.post(reverse("task_image-create"), data_for_create)
+        url = reverse("task_image-retrieve", args=[response.data["id"]])
+        assert admin_test_client.get(url).data["variants"] == {}
+        worker.run_pending()
+        response = admin_test_client.get(url)
+        assert response.data["status"] == models.TaskImage.Status.READY
+        assert set(response.data["variants"]) == set(settings.IMAGE_VARIANTS)
 
     def test_unsuccessful(self, admin_test_client: APIClient, task: models.Task, built_task_image: models.TaskImage):
         data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
@@ -466,6 +1148,18 @@ class TestCreateTaskImage:
         response = user_test_client.post(reverse("task_image-create"), data_for_create)
         assert response.status_code == 403
 
+    def test_not_task_author_num_queries(
+            self, user_test_client: APIClient,
+            task: models.Task,
+            built_task_image: models.TaskImage,
+            django_assert_num_queries
+    ):
+        data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
+        data_for_create["task"] = task.id
+        with django_assert_num_queries(1):
+            response = user_test_client.post(reverse("task_image-create"), data_for_create)
+        assert response.status_code == 403
+
     def test_not_auth_user(self, test_client: APIClient, task: models.Task, built_task_image: models.TaskImage):
         data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
         data_for_create["task"] = task.id
@@ -473,6 +1167,95 @@ class TestCreateTaskImage:
         assert response.status_code == 401
 
 
+class TestTaskImageUpload:
+    @pytest.fixture(autouse=True)
+    def chunks_dir(self, settings, tmp_path):
+        settings.FILE_UPLOAD_CHUNKS_DIR = str(tmp_path)
+
+    @pytest.fixture
+    def content(self, built_task_image: models.TaskImage) -> bytes:
+        return built_task_image.image.read()
+
+    def upload(self, client: APIClient, content: bytes, chunk_size: int) -> str:
+        response = client.post(reverse("task_image_upload-create"), {"filename": "photo.jpg", "size": len(content)})
+        assert response.status_code == 201
+        upload_id = response.data["id"]
+        for start in range(0, len(content), chunk_size):
+            chunk = content[start:start + chunk_size]
+            response = client.patch(
+                reverse("task_image_upload-detail", args=[upload_id]),
+                chunk,
+                content_type="application/octet-stream",
+                HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(chunk) - 1}/{len(content)}",
+            )
+            assert response.status_code == 200
+            assert response.data["offset"] == start + len(chunk)
+        return upload_id
+
+    def test_success(self, admin_test_client: APIClient, task: models.Task, content: bytes):
+        upload_id = self.upload(admin_test_client, content, chunk_size=len(content) // 3 + 1)
+        response = admin_test_client.post(
+            reverse("task_image_upload-complete", args=[upload_id]), {"title": "photo", "task": task.id}
+        )
+        assert response.status_code == 201
+        task_image = models.TaskImage.objects.get(id=response.data["id"])
+        assert task_image.image.read() == content
+        assert not models.TaskImageUpload.objects.exists()
+
+    def test_resume(self, admin_test_client: APIClient, content: bytes):
+        upload_id = self.upload(admin_test_client, content[:10], chunk_size=10)
+        models.TaskImageUpload.objects.filter(id=upload_id).update(size=len(content))
+        response = admin_test_client.get(reverse("task_image_upload-detail", args=[upload_id]))
+        assert response.data["offset"] == 10
+
+    def test_wrong_offset(self, admin_test_client: APIClient, content: bytes):
+        upload_id = self.upload(admin_test_client, content, chunk_size=len(content))
+        response = admin_test_client.patch(
+            reverse("task_image_upload-detail", args=[upload_id]),
+            content[:10],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes 0-9/{len(content)}",
+        )
+        assert response.status_code == 409
+
+    def test_invalid_content_range(self, admin_test_client: APIClient, content: bytes):
+        response = admin_test_client.post(reverse("task_image_upload-create"), {"filename": "photo.jpg", "size": 10})
+        upload_id = response.data["id"]
+        response = admin_test_client.patch(
+            reverse("task_image_upload-detail", args=[upload_id]),
+            content[:10],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE="bytes 0-9",
+        )
+        assert response.status_code == 400
+
+    def test_incomplete(self, admin_test_client: APIClient, task: models.Task):
+        response = admin_test_client.post(reverse("task_image_upload-create"), {"filename": "photo.jpg", "size": 10})
+        response = admin_test_client.post(
+            reverse("task_image_upload-complete", args=[response.data["id"]]), {"title": "photo", "task": task.id}
+        )
+        assert response.status_code == 409
+
+    def test_not_an_image_extension(self, admin_test_client: APIClient):
+        response = admin_test_client.post(reverse("task_image_upload-create"), {"filename": "photo.exe", "size": 10})
+        assert response.status_code == 400
+
+    def test_not_upload_author(self, admin_test_client: APIClient, user_test_client: APIClient, content: bytes):
+        upload_id = self.upload(admin_test_client, content, chunk_size=len(content))
+        response = user_test_client.get(reverse("task_image_upload-detail", args=[upload_id]))
+        assert response.status_code == 404
+
+    def test_delete(self, admin_test_client: APIClient, content: bytes, tmp_path):
+        upload_id = self.upload(admin_test_client, content, chunk_size=len(content))
+        response = admin_test_client.delete(reverse("task_image_upload-detail", args=[upload_id]))
+        assert response.status_code == 204
+        assert not list(tmp_path.iterdir())
+
+    def test_not_auth_user(self, test_client: APIClient):
+        response = test_client.post(reverse("task_image_upload-create"), {"filename": "photo.jpg", "size": 10})
+        assert response.status_code == 401
+
+
 class TestRetrieveTaskImage:
     def test_success(self, admin_test_client: APIClient, task_images: List[models.TaskImage]):
         task_image = random.choice(task_images)
@@ -482,6 +1265,34 @@ class TestRetrieveTaskImage:
         assert response.status_code == 200
         assert (task_image_data["id"], task_image_data["title"]) == (response_data["id"], response_data["title"])
 
+    def test_variants(self, test_client: APIClient, task_images: List[models.TaskImage]):
+        task_image = random.choice(task_images)
+        url = reverse("task_image-retrieve", args=[task_image.id])
+        response = test_client.get(url)
+        assert response.status_code == 200
+        assert response.data["variants"] == {}
+        assert not models.TaskImage.objects.get(id=task_image.id).source_hash
+        call_command("backfill_image_variants")
+        worker.run_pending()
+        assert models.TaskImage.objects.get(id=task_image.id).source_hash
+        response = test_client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 200
+        assert set(response.data["variants"]) == set(settings.IMAGE_VARIANTS)
+
+    def test_missing_file(self, test_client: APIClient, task_images: List[models.TaskImage]):
+        task_image = random.choice(task_images)
+        task_image.image.storage.delete(task_image.image.name)
+        response = test_client.get(reverse("task_image-retrieve", args=[task_image.id]))
+        assert response.status_code == 200
+        assert response.data["variants"] == {}
+
+    def test_not_modified(self, test_client: APIClient, task_images: List[models.TaskImage]):
+        url = reverse("task_image-retrieve", args=[random.choice(task_images).id])
+        response = test_client.get(url)
+        assert response.status_code == 200
+        response = test_client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        assert response.status_code == 304
+
     def test_not_exists(self, admin_test_client: APIClient):
         response = admin_test_client.get(reverse("task_image-retrieve", args=[random.randint(100, 200)]))
         assert response.status_code == 404
@@ -525,6 +1336,20 @@ class TestDeleteTaskImage:
         response = user_test_client.delete(reverse("task_image-delete", args=[task_image.id]))
         assert response.status_code == 403
 
+    def test_num_queries(self, admin_test_client, task_image: models.TaskImage, django_assert_num_queries):
+        with django_assert_num_queries(4):
+            response = admin_test_client.delete(reverse("task_image-delete", args=[task_image.id]))
+        assert response.status_code == 204
+
+    def test_with_not_author_num_queries(
+            self, user_test_client: APIClient,
+            task_image: models.TaskImage,
+            django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            response = user_test_client.delete(reverse("task_image-delete", args=[task_image.id]))
+        assert response.status_code == 403
+
     def test_not_exist_task_image(self, admin_test_client, task_images: List[models.TaskImage]):
         response = admin_test_client.delete(reverse("task_image-delete", args=[100]))
         assert response.status_code == 404
@@ -0,0 +1,44 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+
+from tasks import models, views
+
+
+def get_plan(queryset: QuerySet) -> str:
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def uses_sequential_scan(plan: str, table_name: str) -> bool:
+    if connection.vendor == "postgresql":
+        return f"Seq Scan on {table_name}" in plan
+    return any(
+        f"SCAN {table_name}" in line and "USING" not in line
+        for line in plan.splitlines()
+    )
+
+
+class TestTaskIndexes:
+    @pytest.mark.parametrize("lookup", [{}, {"available": True}, {"user__username": "admin"}])
+    def test_task_list_query_uses_index(self, tasks: List[models.Task], lookup: dict):
+        queryset = views.TaskList.queryset.filter(**lookup).order_by("-created_at", "-id")[:50]
+        plan = get_plan(queryset)
+        assert not uses_sequential_scan(plan, models.Task._meta.db_table), plan
+
+    def test_task_mine_query_uses_user_index(self, admin_user, tasks: List[models.Task]):
+        queryset = models.Task.objects.filter(user_id=admin_user.id).order_by("-created_at", "-id")[:50]
+        plan = get_plan(queryset)
+        assert "task_user_created_at_id_idx" in plan, plan
+        assert "TEMP B-TREE" not in plan and "Sort" not in plan, plan
+
+
+class TestLookupIndexes:
+    @pytest.mark.parametrize("model", [models.Category, models.Status])
+    def test_exact_name_uses_index(self, category: models.Category, status: models.Status, model):
+        plan = get_plan(model.objects.filter(name="name"))
+        assert f"{model._meta.model_name}_name_idx" in plan, plan
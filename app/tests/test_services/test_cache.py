@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from common.cache import get_or_set_once
+
+
+class TestGetOrSetOnce:
+    def test_cached(self):
+        cache.set("key", "cached")
+        assert get_or_set_once("key", lambda: "computed", timeout=60) == "cached"
+
+    def test_computed_once(self):
+        calls = []
+        barrier = threading.Barrier(10)
+
+        def compute() -> str:
+            calls.append(None)
+            time.sleep(0.2)
+            return "computed"
+
+        def get(results: list) -> None:
+            barrier.wait()
+            results.append(get_or_set_once("key", compute, timeout=60))
+
+        results = []
+        threads = [threading.Thread(target=get, args=(results,)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert results == ["computed"] * 10
+        assert cache.get("key") == "computed"
+
+    def test_lock_released_on_error(self):
+        def fail() -> str:
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            get_or_set_once("key", fail, timeout=60)
+        assert cache.get("key:lock") is None
+        assert get_or_set_once("key", lambda: "computed", timeout=60) == "computed"
+
+    def test_lock_timeout(self, settings):
+        settings.CACHE_LOCK_TIMEOUT = 0.1
+        cache.add("key:lock", True, timeout=60)
+        assert get_or_set_once("key", lambda: "computed", timeout=60) == "computed"
+        assert cache.get("key") is None
@@ -0,0 +1,53 @@
+import datetime
+from typing import List
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from common.db import update_returning
+from tasks import models
+
+
+class TestUpdateReturning:
+    @pytest.fixture(params=["returning", "fallback"])
+    def returning(self, request, monkeypatch) -> bool:
+        """Request it after the fixtures that create rows, the fallback also changes how they are inserted"""
+        if request.param == "fallback":
+            monkeypatch.setattr(connection.features, "can_return_columns_from_insert", False)
+        return request.param == "returning"
+
+    def test_success(self, tasks: List[models.Task], returning: bool):
+        edited_at = timezone.now() + datetime.timedelta(days=1)
+        task = tasks[0]
+        updated = update_returning(
+            models.Task.objects.filter(id=task.id), title="another", edited_at=edited_at, version=F("version") + 1
+        )
+        assert len(updated) == 1
+        assert isinstance(updated[0], models.Task)
+        assert updated[0].id == task.id
+        assert updated[0].title == "another"
+        assert updated[0].edited_at == edited_at
+        assert updated[0].version == task.version + 1
+        assert updated[0].available == task.available
+        assert updated[0].user_id == task.user_id
+        assert models.Task.objects.get(id=task.id).title == "another"
+
+    def test_filtered(self, tasks: List[models.Task], returning: bool):
+        ids = {task.id for task in tasks[:2]}
+        updated = update_returning(models.Task.objects.filter(id__in=ids), title="another")
+        assert {task.id for task in updated} == ids
+        assert models.Task.objects.filter(title="another").count() == len(ids)
+
+    def test_nothing_matched(self, db, returning: bool):
+        assert update_returning(models.Task.objects.filter(id=1000), title="another") == []
+
+    def test_single_statement(self, task: models.Task, returning: bool):
+        if not returning or connection.vendor != "postgresql":
+            pytest.skip("Checks UPDATE ... RETURNING on PostgreSQL")
+        with CaptureQueriesContext(connection) as queries:
+            update_returning(models.Task.objects.filter(id=task.id), title="another")
+        assert len(queries.captured_queries) == 1
+        assert "RETURNING" in queries.captured_queries[0]["sql"]
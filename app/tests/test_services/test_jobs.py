@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from jobs import registry, services, worker
+from jobs.models import Job
+
+calls = []
+
+
+@registry.register("tests.record")
+def record(value: int) -> None:
+    calls.append(value)
+
+
+@registry.register("tests.fail")
+def fail() -> None:
+    raise ValueError("failed")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+class TestEnqueue:
+    def test_success(self, db):
+        job = services.enqueue("tests.record", value=1)
+        assert job.status == Job.Status.PENDING
+        assert job.payload == {"value": 1}
+        assert calls == []
+
+
+class TestRunPending:
+    def test_success(self, db):
+        jobs = [services.enqueue("tests.record", value=value) for value in range(3)]
+        assert worker.run_pending() == 3
+        assert calls == [0, 1, 2]
+        for job in jobs:
+            job.refresh_from_db()
+            assert job.status == Job.Status.DONE
+            assert job.attempts == 1
+
+    def test_limit(self, db):
+        for value in range(3):
+            services.enqueue("tests.record", value=value)
+        assert worker.run_pending(limit=2) == 2
+        assert Job.objects.filter(status=Job.Status.PENDING).count() == 1
+
+    def test_retried_until_failed(self, db, settings):
+        settings.JOBS_MAX_ATTEMPTS = 2
+        job = services.enqueue("tests.fail")
+        worker.run_pending()
+        job.refresh_from_db()
+        assert job.status == Job.Status.FAILED
+        assert job.attempts == 2
+        assert "ValueError" in job.error
+
+    def test_stale_running_job(self, db):
+        job = services.enqueue("tests.record", value=1)
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.RUNNING,
+            started_at=timezone.now() - datetime.timedelta(days=1),
+        )
+        assert worker.run_pending() == 1
+        assert calls == [1]
+
+    def test_running_job_skipped(self, db):
+        job = services.enqueue("tests.record", value=1)
+        Job.objects.filter(id=job.id).update(status=Job.Status.RUNNING, started_at=timezone.now())
+        assert worker.run_pending() == 0
+
+
+class TestClaimJob:
+    def test_claimed_by_another_worker(self, db, monkeypatch):
+        claimed, pending = [services.enqueue("tests.record", value=value) for value in range(2)]
+        first = QuerySet.first
+
+        def first_claimed_meanwhile(queryset):
+            job = first(queryset)
+            monkeypatch.setattr(QuerySet, "first", first)
+            Job.objects.filter(id=job.id).update(status=Job.Status.RUNNING, attempts=1, started_at=timezone.now())
+            return job
+
+        monkeypatch.setattr(QuerySet, "first", first_claimed_meanwhile)
+        job = worker.claim_job()
+        assert job.id == pending.id
+        assert job.attempts == 1
+        assert Job.objects.get(id=claimed.id).attempts == 1
+
+
+class TestRunJobsCommand:
+    def test_once(self, db):
+        services.enqueue("tests.record", value=1)
+        call_command("run_jobs", "--once")
+        assert calls == [1]
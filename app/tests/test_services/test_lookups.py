@@ -0,0 +1,38 @@
+import pytest
+
+from tasks import lookups, models
+
+
+class TestGetLookupName:
+    def test_success(self, category: models.Category):
+        assert lookups.get_lookup_name(models.Category, category.id) == category.name
+
+    def test_without_queries_when_cached(self, category: models.Category, django_assert_num_queries):
+        lookups.get_lookup_name(models.Category, category.id)
+        with django_assert_num_queries(0):
+            assert lookups.get_lookup_name(models.Category, category.id) == category.name
+
+    def test_invalidated_on_save(self, status: models.Status):
+        lookups.get_lookup_name(models.Status, status.id)
+        status.name = "another"
+        status.save()
+        assert lookups.get_lookup_name(models.Status, status.id) == "another"
+
+    def test_invalidated_on_commit(self, status: models.Status, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            status.name = "another"
+            status.save()
+            version = lookups.get_lookup_version(models.Status)
+            assert lookups.get_lookup_name(models.Status, status.id) == "another"
+        assert lookups.get_lookup_version(models.Status) != version
+
+    def test_invalidated_on_delete(self, category: models.Category):
+        lookups.get_lookup_name(models.Category, category.id)
+        category_id = category.id
+        category.delete()
+        with pytest.raises(models.Category.DoesNotExist):
+            lookups.get_lookup_name(models.Category, category_id)
+
+    def test_not_exist(self, db):
+        with pytest.raises(models.Category.DoesNotExist):
+            lookups.get_lookup_name(models.Category, 1)
@@ -1,13 +1,32 @@
+import os
 import random
+import threading
+from datetime import timedelta
+from io import BytesIO
 from typing import List
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.forms import model_to_dict
 from django.http import response, Http404
+from django.utils import timezone
+from PIL import Image as PillowImage
 from rest_framework import exceptions
 
-from tasks import models, services, serializers
+from common import images, uploads
+from common.models import StoredFile
+from common.storage import ContentAddressedStorage
+from common.exceptions import Conflict, PreconditionFailed
+from jobs import worker
+from jobs.models import Job
+from tasks import cache, models, services, serializers
 
 User = get_user_model()
 
@@ -34,6 +53,102 @@ class TestTaskCreate:
         assert exception.value.status_code == 400
 
 
+class TestBulkCreateTasks:
+    def test_success(self, admin_user: User, category: models.Category, status: models.Status):
+        data = [
+            {"title": f"title {number}", "category": category.id, "status": status.id, "text": "text"}
+            for number in range(10)
+        ]
+        tasks = services.bulk_create_tasks(user=admin_user, data=data)
+        assert all(task.id for task in tasks)
+        assert models.Task.objects.filter(user=admin_user).count() == len(data)
+
+    def test_query_count(
+            self,
+            admin_user: User,
+            category: models.Category,
+            status: models.Status,
+            django_assert_max_num_queries
+    ):
+        data = [
+            {"title": f"title {number}", "category": category.id, "status": status.id, "text": "text"}
+            for number in range(50)
+        ]
+        with django_assert_max_num_queries(5):
+            services.bulk_create_tasks(user=admin_user, data=data)
+
+    def test_not_exists_related_id(self, admin_user: User, category: models.Category, status: models.Status):
+        data = [{"title": "title", "category": category.id, "status": status.id + 100, "text": "text"}]
+        with pytest.raises(exceptions.ValidationError) as exception:
+            services.bulk_create_tasks(user=admin_user, data=data)
+        assert "status" in exception.value.detail[0]
+
+
+class TestBulkUpdateTasks:
+    def test_success(self, admin_user: User, tasks: List[models.Task]):
+        data = [{"id": task.id, "title": "another"} for task in tasks]
+        updated_tasks = services.bulk_update_tasks(user=admin_user, data=data)
+        assert all(task.title == "another" for task in updated_tasks)
+        assert models.Task.objects.filter(title="another").count() == len(tasks)
+
+    def test_not_author(self, user_and_its_password: dict, tasks: List[models.Task]):
+        data = [{"id": task.id, "title": "another"} for task in tasks]
+        with pytest.raises(exceptions.ValidationError):
+            services.bulk_update_tasks(user=user_and_its_password["user"], data=data)
+
+    def test_increments_version(self, admin_user: User, tasks: List[models.Task]):
+        models.Task.objects.filter(id=tasks[0].id).update(version=5)
+        data = [{"id": task.id, "title": "another"} for task in tasks]
+        updated_tasks = services.bulk_update_tasks(user=admin_user, data=data)
+        assert updated_tasks[0].version == 6
+        assert models.Task.objects.get(id=tasks[0].id).version == 6
+
+    def test_locks_rows(self, admin_user: User, tasks: List[models.Task]):
+        if not connection.features.has_select_for_update:
+            pytest.skip("The database doesn't support SELECT ... FOR UPDATE")
+        data = [{"id": task.id, "title": "another"} for task in tasks]
+        with CaptureQueriesContext(connection) as context:
+            services.bulk_update_tasks(user=admin_user, data=data)
+        assert any("FOR UPDATE" in query["sql"] for query in context.captured_queries)
+
+
+class TestBulkDeleteTasks:
+    def test_success(self, admin_user: User, tasks: List[models.Task]):
+        services.bulk_delete_tasks(user=admin_user, data={"ids": [task.id for task in tasks]})
+        assert not models.Task.objects.exists()
+
+    def test_not_exist_task(self, admin_user: User, tasks: List[models.Task]):
+        with pytest.raises(exceptions.ValidationError):
+            services.bulk_delete_tasks(user=admin_user, data={"ids": [tasks[0].id, 1000]})
+        assert models.Task.objects.count() == len(tasks)
+
+    @pytest.mark.parametrize("tasks", [20], indirect=True)
+    def test_invalidates_list_once(
+            self, admin_user: User, tasks: List[models.Task], django_capture_on_commit_callbacks, monkeypatch
+    ):
+        increments = []
+        monkeypatch.setattr(cache, "_increment_task_list_generation", lambda: increments.append(None))
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            services.bulk_delete_tasks(user=admin_user, data={"ids": [task.id for task in tasks]})
+        assert len(callbacks) == 1
+        assert len(increments) == 2
+        assert not models.Task.objects.exists()
+
+    def test_validated_before_delete(self, admin_user: User, tasks: List[models.Task]):
+        with CaptureQueriesContext(connection) as queries, pytest.raises(exceptions.ValidationError) as exception:
+            services.bulk_delete_tasks(user=admin_user, data={"ids": [tasks[0].id, 1000]})
+        assert not any(query["sql"].startswith("DELETE") for query in queries.captured_queries)
+        assert exception.value.detail["ids"][0] == []
+        assert exception.value.detail["ids"][1]
+
+    def test_locks_rows(self, admin_user: User, tasks: List[models.Task]):
+        if not connection.features.has_select_for_update:
+            pytest.skip("The database doesn't support SELECT ... FOR UPDATE")
+        with CaptureQueriesContext(connection) as queries:
+            services.bulk_delete_tasks(user=admin_user, data={"ids": [task.id for task in tasks]})
+        assert any("FOR UPDATE" in query["sql"] for query in queries.captured_queries)
+
+
 class TestGetTask:
     def test_success(self, admin_user: User, task: models.Task):
         task_in_db = services.get_task(id_=task.id)
@@ -44,6 +159,16 @@ class TestGetTask:
             services.get_task(id_=random.randint(1, 10))
 
 
+class TestAsyncGetTask:
+    def test_success(self, task: models.Task):
+        task_in_db = async_to_sync(services.aget_task)(id_=task.id)
+        assert task == task_in_db
+
+    def test_not_exist(self, db):
+        with pytest.raises(Http404):
+            async_to_sync(services.aget_task)(id_=random.randint(1, 10))
+
+
 class TestDeleteTask:
     def test_success(self, admin_user: User, task: models.Task):
         services.delete_task(user=admin_user, id_=task.id)
@@ -86,6 +211,25 @@ class TestTaskUpdate:
         with pytest.raises(exceptions.ValidationError):
             services.update_task(user=admin_user, id_=task.id, data=data_for_update)
 
+    def test_invalid_value(self, admin_user: User, task: models.Task):
+        with pytest.raises(exceptions.ValidationError):
+            services.update_task(user=admin_user, id_=task.id, data={"title": "a" * 300})
+
+    def test_single_query(self, admin_user: User, task: models.Task, django_assert_num_queries):
+        data_for_update = {"title": "another", "available": False}
+        with django_assert_num_queries(1):
+            updated_task = services.update_task(user=admin_user, id_=task.id, data=data_for_update)
+        assert updated_task.id == task.id
+        assert updated_task.edited_at > task.edited_at
+        assert updated_task.created_at == task.created_at
+        assert updated_task.text == task.text
+
+    def test_related_field(self, admin_user: User, task: models.Task, categories: List[models.Category]):
+        category = random.choice(categories)
+        updated_task = services.update_task(user=admin_user, id_=task.id, data={"category": category.id})
+        assert updated_task.category_id == category.id
+        assert models.Task.objects.get(id=task.id).category_id == category.id
+
     def test_not_author(self, user_and_its_password: User, task: models.Task):
         data_for_update = {"title": "another", "available": False}
         with pytest.raises(exceptions.PermissionDenied):
@@ -96,6 +240,85 @@ class TestTaskUpdate:
         with pytest.raises(exceptions.NotFound):
             services.update_task(user=admin_user, id_=random.randint(1, 100), data=data_for_update)
 
+    def test_version(self, admin_user: User, task: models.Task):
+        updated_task = services.update_task(user=admin_user, id_=task.id, data={"title": "another"}, version=task.version)
+        assert updated_task.version == task.version + 1
+
+    def test_stale_version(self, admin_user: User, task: models.Task):
+        services.update_task(user=admin_user, id_=task.id, data={"title": "first"}, version=task.version)
+        with pytest.raises(PreconditionFailed):
+            services.update_task(user=admin_user, id_=task.id, data={"title": "second"}, version=task.version)
+        assert models.Task.objects.get(id=task.id).title == "first"
+
+    def test_stale_save_gets_new_version(self, admin_user: User, task: models.Task):
+        updated_task = services.update_task(user=admin_user, id_=task.id, data={"title": "first"}, version=task.version)
+        task.title = "second"
+        task.save()
+        assert task.version == updated_task.version + 1
+        assert models.Task.objects.get(id=task.id).version == task.version
+        with pytest.raises(PreconditionFailed):
+            services.update_task(user=admin_user, id_=task.id, data={"title": "third"}, version=updated_task.version)
+
+
+class TestCompleteTask:
+    def get_counts(self, user: User, category: models.Category) -> tuple:
+        user_count = models.UserCompletionCount.objects.filter(user=user).values_list("count", flat=True).first()
+        category_count = models.CategoryCompletionCount.objects.filter(
+            category=category
+        ).values_list("count", flat=True).first()
+        return user_count, category_count
+
+    @pytest.mark.parametrize("task", [{"available": True}], indirect=True)
+    def test_success(self, user_and_its_password: dict, task: models.Task):
+        user = user_and_its_password["user"]
+        completion = services.complete_task(user=user, id_=task.id)
+        assert (completion.task_id, completion.user_id, completion.category_id) == (task.id, user.id, task.category_id)
+        assert self.get_counts(user, task.category) == (1, 1)
+
+    def test_counts(self, admin_user: User, tasks: List[models.Task]):
+        for task in tasks:
+            services.complete_task(user=admin_user, id_=task.id)
+        assert self.get_counts(admin_user, tasks[0].category) == (len(tasks), len(tasks))
+        services.uncomplete_task(user=admin_user, id_=tasks[0].id)
+        assert self.get_counts(admin_user, tasks[0].category) == (len(tasks) - 1, len(tasks) - 1)
+
+    def test_already_completed(self, admin_user: User, task: models.Task):
+        services.complete_task(user=admin_user, id_=task.id)
+        with pytest.raises(Conflict):
+            services.complete_task(user=admin_user, id_=task.id)
+        assert self.get_counts(admin_user, task.category) == (1, 1)
+
+    @pytest.mark.parametrize("task", [{"available": False}], indirect=True)
+    def test_not_available(self, user_and_its_password: dict, task: models.Task):
+        with pytest.raises(exceptions.PermissionDenied):
+            services.complete_task(user=user_and_its_password["user"], id_=task.id)
+
+    def test_not_exists(self, admin_user: User):
+        with pytest.raises(Http404):
+            services.complete_task(user=admin_user, id_=1)
+
+    def test_category_kept_after_task_change(self, admin_user: User, task: models.Task):
+        services.complete_task(user=admin_user, id_=task.id)
+        category = task.category
+        task.category = models.Category.objects.create(name="another")
+        task.save()
+        services.uncomplete_task(user=admin_user, id_=task.id)
+        assert self.get_counts(admin_user, category) == (0, 0)
+
+    def test_task_deleted(self, admin_user: User, task: models.Task):
+        services.complete_task(user=admin_user, id_=task.id)
+        services.delete_task(user=admin_user, id_=task.id)
+        assert self.get_counts(admin_user, task.category) == (0, 0)
+
+    def test_uncomplete_not_allowed(self, admin_user: User, user_and_its_password: dict, task: models.Task):
+        services.complete_task(user=admin_user, id_=task.id)
+        with pytest.raises(exceptions.PermissionDenied):
+            services.uncomplete_task(user=user_and_its_password["user"], id_=task.id)
+
+    def test_uncomplete_not_completed(self, admin_user: User, task: models.Task):
+        with pytest.raises(Http404):
+            services.uncomplete_task(user=admin_user, id_=task.id)
+
 
 class TestCreateTaskImage:
     def test_success(self, admin_user: User, tasks: List[models.Task], built_task_image: models.TaskImage):
@@ -107,6 +330,90 @@ class TestCreateTaskImage:
         assert task_image.id
         assert task_image.task.id == task.id
 
+    def test_variants(self, admin_user: User, task: models.Task, built_task_image: models.TaskImage):
+        data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
+        data_for_create["task"] = task.id
+        task_image = services.create_task_image(user=admin_user, data=data_for_create)
+        assert task_image.status == models.TaskImage.Status.PENDING
+        assert not task_image.source_hash
+        worker.run_pending()
+        task_image.refresh_from_db()
+        assert task_image.status == models.TaskImage.Status.READY
+        assert task_image.source_hash
+        for variant, size in settings.IMAGE_VARIANTS.items():
+            name = images.get_variant_name(task_image.source_hash, variant)
+            assert default_storage.exists(name)
+            with PillowImage.open(default_storage.open(name)) as variant_image:
+                assert variant_image.format == settings.IMAGE_VARIANT_FORMAT
+                assert variant_image.width <= size[0] and variant_image.height <= size[1]
+
+    def test_processed(self, admin_user: User, task: models.Task):
+        exif = PillowImage.Exif()
+        exif[0x0112] = 6
+        content = BytesIO()
+        PillowImage.new("RGB", (4000, 1000)).save(content, format="JPEG", exif=exif)
+        data_for_create = {"title": "photo", "task": task.id, "image": ContentFile(content.getvalue(), "photo.jpg")}
+        task_image = services.create_task_image(user=admin_user, data=data_for_create)
+        worker.run_pending()
+        task_image.refresh_from_db()
+        with PillowImage.open(task_image.image) as image:
+            assert image.size == (settings.IMAGE_MAX_SIZE[1] // 4, settings.IMAGE_MAX_SIZE[1])
+            assert not image.getexif()
+
+    def test_deduplicated(
+            self,
+            admin_user: User,
+            task: models.Task,
+            built_task_image: models.TaskImage,
+            django_capture_on_commit_callbacks
+    ):
+        content = built_task_image.image.read()
+        task_images = [
+            services.create_task_image(
+                user=admin_user, data={"title": "photo", "task": task.id, "image": ContentFile(content, name)}
+            )
+            for name in ("first.jpg", "second.jpg")
+        ]
+        uploaded_name = task_images[0].image.name
+        assert task_images[1].image.name == uploaded_name
+        assert uploaded_name.startswith("taskimage/")
+        with django_capture_on_commit_callbacks(execute=True):
+            worker.run_pending()
+        names = {task_image.image.name for task_image in models.TaskImage.objects.all()}
+        assert len(names) == 1
+        assert not task_images[0].image.storage.exists(uploaded_name)
+
+    def test_not_an_image(self, admin_user: User, task: models.Task):
+        data_for_create = {"title": "photo", "task": task.id, "image": ContentFile(b"not an image", "photo.jpg")}
+        task_image = services.create_task_image(user=admin_user, data=data_for_create)
+        worker.run_pending()
+        task_image.refresh_from_db()
+        assert task_image.status == models.TaskImage.Status.FAILED
+        assert Job.objects.get().status == Job.Status.FAILED
+
+    def test_unexpected_error(self, admin_user: User, task: models.Task, built_task_image: models.TaskImage, monkeypatch):
+        def fail(file):
+            raise ValueError()
+
+        monkeypatch.setattr(images, "process_image", fail)
+        data_for_create = {"title": "photo", "task": task.id, "image": built_task_image.image}
+        task_image = services.create_task_image(user=admin_user, data=data_for_create)
+        worker.run_pending()
+        task_image.refresh_from_db()
+        assert task_image.status == models.TaskImage.Status.FAILED
+        assert task_image.image.storage.exists(task_image.image.name)
+
+    def test_failure_touches_task(self, admin_user: User, task: models.Task):
+        data_for_create = {"title": "photo", "task": task.id, "image": ContentFile(b"not an image", "photo.jpg")}
+        services.create_task_image(user=admin_user, data=data_for_create)
+        task.refresh_from_db()
+        generation = cache.get_task_list_generation()
+        worker.run_pending()
+        edited = models.Task.objects.get(id=task.id)
+        assert edited.version == task.version + 1
+        assert edited.edited_at > task.edited_at
+        assert cache.get_task_list_generation() != generation
+
     def test_unsuccessful(self, admin_user: User, tasks: List[models.Task], built_task_image: models.TaskImage):
         task = random.choice(tasks)
         data_for_create = {k: v for k, v in model_to_dict(built_task_image).items() if v is not None}
@@ -124,6 +431,103 @@ class TestCreateTaskImage:
         assert exception.value.status_code == 400
 
 
+class TestTaskImageUpload:
+    @pytest.fixture(autouse=True)
+    def chunks_dir(self, settings, tmp_path):
+        settings.FILE_UPLOAD_CHUNKS_DIR = str(tmp_path)
+
+    def test_success(self, admin_user: User, task: models.Task, built_task_image: models.TaskImage):
+        content = built_task_image.image.read()
+        upload_data = {"filename": "photo.jpg", "size": len(content)}
+        upload = services.create_task_image_upload(user=admin_user, data=upload_data)
+        middle = len(content) // 2
+        services.append_task_image_upload(
+            user=admin_user,
+            upload_id=upload.id,
+            content_range=f"bytes 0-{middle - 1}/{len(content)}",
+            stream=BytesIO(content[:middle]),
+        )
+        upload = services.append_task_image_upload(
+            user=admin_user,
+            upload_id=upload.id,
+            content_range=f"bytes {middle}-{len(content) - 1}/{len(content)}",
+            stream=BytesIO(content[middle:]),
+        )
+        assert upload.offset == len(content)
+        task_image = services.complete_task_image_upload(
+            user=admin_user, upload_id=upload.id, data={"title": "photo", "task": task.id}
+        )
+        assert task_image.image.read() == content
+        assert not os.path.exists(uploads.get_chunks_path(upload.id))
+
+    def test_short_body(self, admin_user: User):
+        upload = services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+        with pytest.raises(exceptions.ValidationError):
+            services.append_task_image_upload(
+                user=admin_user, upload_id=upload.id, content_range="bytes 0-9/10", stream=BytesIO(b"12345")
+            )
+        assert not os.path.exists(uploads.get_chunks_path(upload.id))
+
+    def test_body_read_outside_transaction(self, admin_user: User):
+        upload = services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+        atomic_blocks = len(connection.atomic_blocks)
+
+        class Stream(BytesIO):
+            def read(self, *args) -> bytes:
+                assert len(connection.atomic_blocks) == atomic_blocks
+                return super().read(*args)
+
+        upload = services.append_task_image_upload(
+            user=admin_user, upload_id=upload.id, content_range="bytes 0-4/10", stream=Stream(b"12345")
+        )
+        assert upload.offset == 5
+
+    def test_wrong_total(self, admin_user: User):
+        upload = services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+        with pytest.raises(exceptions.ValidationError):
+            services.append_task_image_upload(
+                user=admin_user, upload_id=upload.id, content_range="bytes 0-4/20", stream=BytesIO(b"12345")
+            )
+
+    def test_too_large(self, admin_user: User, settings):
+        settings.FILE_UPLOAD_MAX_SIZE = 10
+        with pytest.raises(exceptions.ValidationError):
+            services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 11})
+
+    def test_chunk_extends_expiry(self, admin_user: User):
+        upload = services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+        models.TaskImageUpload.objects.filter(id=upload.id).update(expires_at=timezone.now() + timedelta(seconds=1))
+        upload = services.append_task_image_upload(
+            user=admin_user, upload_id=upload.id, content_range="bytes 0-4/10", stream=BytesIO(b"12345")
+        )
+        assert upload.expires_at > timezone.now() + timedelta(seconds=settings.FILE_UPLOAD_EXPIRY - 60)
+
+    def test_expired(self, admin_user: User):
+        upload = services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+        models.TaskImageUpload.objects.filter(id=upload.id).update(expires_at=timezone.now())
+        with pytest.raises(Http404):
+            services.get_task_image_upload(user=admin_user, upload_id=upload.id)
+        with pytest.raises(Http404):
+            services.append_task_image_upload(
+                user=admin_user, upload_id=upload.id, content_range="bytes 0-4/10", stream=BytesIO(b"12345")
+            )
+
+    def test_delete_expired(self, admin_user: User):
+        expired, active = [
+            services.create_task_image_upload(user=admin_user, data={"filename": "photo.jpg", "size": 10})
+            for _ in range(2)
+        ]
+        for upload in (expired, active):
+            services.append_task_image_upload(
+                user=admin_user, upload_id=upload.id, content_range="bytes 0-4/10", stream=BytesIO(b"12345")
+            )
+        models.TaskImageUpload.objects.filter(id=expired.id).update(expires_at=timezone.now())
+        call_command("delete_expired_uploads")
+        assert list(models.TaskImageUpload.objects.values_list("id", flat=True)) == [active.id]
+        assert not os.path.exists(uploads.get_chunks_path(expired.id))
+        assert os.path.exists(uploads.get_chunks_path(active.id))
+
+
 class TestRetrieveTaskImage:
     def test_success(self, task_images: List[models.TaskImage]):
         task_image = random.choice(task_images)
@@ -139,6 +543,16 @@ class TestRetrieveTaskImage:
             services.get_task_image(task_image_id=1)
 
 
+class TestAsyncGetTaskImage:
+    def test_success(self, task_images: List[models.TaskImage]):
+        task_image = random.choice(task_images)
+        assert task_image == async_to_sync(services.aget_task_image)(task_image_id=task_image.id)
+
+    def test_not_exists(self, db):
+        with pytest.raises(Http404):
+            async_to_sync(services.aget_task_image)(task_image_id=1)
+
+
 class TestDeleteTaskImage:
     def test_success(self, admin_user: User, task_image: models.TaskImage):
         services.delete_task_image(user=admin_user, task_image_id=task_image.id)
@@ -151,6 +565,93 @@ class TestDeleteTaskImage:
         with pytest.raises(models.TaskImage.DoesNotExist):
             models.TaskImage.objects.get(id=task_image.id)
 
+    def test_file_deleted_with_last_reference(
+            self, admin_user: User,
+            task: models.Task,
+            task_image: models.TaskImage,
+            django_capture_on_commit_callbacks
+    ):
+        worker.run_pending()
+        task_image.refresh_from_db()
+        duplicate = models.TaskImage.objects.create(title="copy", task=task, image=task_image.image.name)
+        duplicate.source_hash = task_image.source_hash
+        duplicate.save()
+        storage = task_image.image.storage
+        variant_name = images.get_variant_name(task_image.source_hash, "thumbnail")
+        with django_capture_on_commit_callbacks(execute=True):
+            services.delete_task_image(user=admin_user, task_image_id=task_image.id)
+        assert storage.exists(duplicate.image.name)
+        assert default_storage.exists(variant_name)
+        with django_capture_on_commit_callbacks(execute=True):
+            services.delete_task_image(user=admin_user, task_image_id=duplicate.id)
+        assert not storage.exists(duplicate.image.name)
+        assert not default_storage.exists(variant_name)
+
+    def test_identical_upload_during_delete(
+            self, admin_user: User,
+            task: models.Task,
+            built_task_image: models.TaskImage,
+            django_capture_on_commit_callbacks
+    ):
+        content = built_task_image.image.read()
+        data = {"title": "photo", "task": task.id}
+        task_image = services.create_task_image(user=admin_user, data={**data, "image": ContentFile(content, "a.jpg")})
+        name = task_image.image.name
+        assert StoredFile.objects.get(name=name).references == 1
+        with django_capture_on_commit_callbacks() as callbacks:
+            services.delete_task_image(user=admin_user, task_image_id=task_image.id)
+        duplicate = services.create_task_image(user=admin_user, data={**data, "image": ContentFile(content, "b.jpg")})
+        for callback in callbacks:
+            callback()
+        assert duplicate.image.name == name
+        assert duplicate.image.storage.exists(name)
+        assert StoredFile.objects.get(name=name).references == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_delete_waits_for_identical_upload(
+            self, admin_user: User,
+            task: models.Task,
+            built_task_image: models.TaskImage,
+            monkeypatch
+    ):
+        if not connection.features.has_select_for_update:
+            pytest.skip("The database doesn't support SELECT ... FOR UPDATE")
+        content = built_task_image.image.read()
+        data = {"title": "photo", "task": task.id}
+        task_image = services.create_task_image(user=admin_user, data={**data, "image": ContentFile(content, "a.jpg")})
+        saved, resume = threading.Event(), threading.Event()
+        save = ContentAddressedStorage.save
+
+        def save_and_wait(storage, name, content, max_length=None):
+            name = save(storage, name, content, max_length=max_length)
+            saved.set()
+            resume.wait(5)
+            return name
+
+        def in_thread(target):
+            def run():
+                try:
+                    target()
+                finally:
+                    connection.close()
+            thread = threading.Thread(target=run)
+            thread.start()
+            return thread
+
+        monkeypatch.setattr(ContentAddressedStorage, "save", save_and_wait)
+        upload = in_thread(lambda: services.create_task_image(
+            user=admin_user, data={**data, "image": ContentFile(content, "b.jpg")}
+        ))
+        assert saved.wait(5)
+        delete = in_thread(lambda: services.delete_task_image(user=admin_user, task_image_id=task_image.id))
+        delete.join(0.5)
+        assert delete.is_alive()
+        resume.set()
+        upload.join(5)
+        delete.join(5)
+        assert task_image.image.storage.exists(task_image.image.name)
+        assert StoredFile.objects.get(name=task_image.image.name).references == 1
+
     def test_with_not_author(self, user_and_its_password: dict, task_image: models.TaskImage):
         with pytest.raises(exceptions.PermissionDenied):
             services.delete_task_image(user=user_and_its_password["user"], task_image_id=task_image.id)
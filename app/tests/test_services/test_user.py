@@ -0,0 +1,96 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user.authentication import ClaimsJWTAuthentication, ClaimsTokenObtainPairSerializer
+from user.models import ClaimsUser, User
+
+
+def authenticate(token) -> User:
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"JWT {token}")
+    user, _ = ClaimsJWTAuthentication().authenticate(request)
+    return user
+
+
+class TestClaimsJWTAuthentication:
+    def test_no_queries(self, user_and_its_password, django_assert_num_queries):
+        token = ClaimsTokenObtainPairSerializer.get_token(user_and_its_password["user"]).access_token
+        with django_assert_num_queries(0):
+            user = authenticate(token)
+        assert isinstance(user, ClaimsUser)
+        assert user.id == user_and_its_password["user"].id
+        assert user.is_active
+        assert not user.is_staff
+
+    def test_staff(self, admin_user, django_assert_num_queries):
+        token = ClaimsTokenObtainPairSerializer.get_token(admin_user).access_token
+        with django_assert_num_queries(0):
+            user = authenticate(token)
+        assert user.is_staff
+
+    def test_inactive(self, user_and_its_password):
+        token = ClaimsTokenObtainPairSerializer.get_token(user_and_its_password["user"]).access_token
+        token["is_active"] = False
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token)
+
+    def test_token_without_claims(self, user_and_its_password, django_assert_num_queries):
+        token = AccessToken.for_user(user_and_its_password["user"])
+        with django_assert_num_queries(1):
+            user = authenticate(token)
+        assert not isinstance(user, ClaimsUser)
+        assert user == user_and_its_password["user"]
+
+
+class TestClaimsTokens:
+    def test_refresh_reloads_claims(self, admin_user, admin_user_data):
+        data = {"username": admin_user_data["username"], "password": admin_user_data["password"]}
+        tokens = APIClient().post(reverse("jwt-create"), data).data
+        assert AccessToken(tokens["access"])["is_staff"]
+        refresh = RefreshToken(tokens["refresh"])
+        assert "is_staff" not in refresh and "is_active" not in refresh
+        admin_user.is_staff = False
+        admin_user.save()
+        response = APIClient().post(reverse("jwt-refresh"), {"refresh": tokens["refresh"]})
+        assert response.status_code == 200
+        access = AccessToken(response.data["access"])
+        assert not access["is_staff"]
+        assert access["is_active"]
+        assert not authenticate(access).is_staff
+
+    def test_refresh_of_token_with_claims(self, admin_user):
+        refresh = RefreshToken.for_user(admin_user)
+        refresh["is_staff"] = True
+        admin_user.is_staff = False
+        admin_user.save()
+        response = APIClient().post(reverse("jwt-refresh"), {"refresh": str(refresh)})
+        assert not AccessToken(response.data["access"])["is_staff"]
+
+
+class TestClaimsUser:
+    def test_deferred_fields_from_cache(self, user_and_its_password, django_assert_num_queries):
+        db_user = user_and_its_password["user"]
+        with django_assert_num_queries(1):
+            user = ClaimsUser.from_claims(str(db_user.id), True, False)
+            assert user.username == db_user.username
+            assert user.email == db_user.email
+        with django_assert_num_queries(0):
+            user = ClaimsUser.from_claims(str(db_user.id), True, False)
+            assert user.username == db_user.username
+        with django_assert_num_queries(1):
+            assert user.password == db_user.password
+
+    def test_invalidated_on_save(self, user_and_its_password):
+        db_user = user_and_its_password["user"]
+        assert ClaimsUser.from_claims(db_user.id, True, False).username == db_user.username
+        db_user.username = "renamed"
+        db_user.save()
+        assert ClaimsUser.from_claims(db_user.id, True, False).username == "renamed"
+
+    def test_deleted_user(self, user_and_its_password):
+        user = ClaimsUser.from_claims(user_and_its_password["user"].id, True, False)
+        user_and_its_password["user"].delete()
+        with pytest.raises(User.DoesNotExist):
+            user.username
@@ -0,0 +1,55 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+from user.models import ClaimsUser, User
+
+CLAIMS = ("is_active", "is_staff")
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's is_active and is_staff as of their creation"""
+    no_copy_claims = RefreshToken.no_copy_claims + CLAIMS
+
+    @property
+    def access_token(self) -> AccessToken:
+        access = super().access_token
+        user = getattr(self, "user", None)
+        if user is None:
+            user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).only(*CLAIMS).first()
+        if user is not None:
+            for claim in CLAIMS:
+                access[claim] = getattr(user, claim)
+        return access
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+    @classmethod
+    def get_token(cls, user: User) -> Token:
+        token = super().get_token(user)
+        token.user = user
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Authenticate without loading the user row, tokens issued before the claims were added fall back to a query"""
+
+    def get_user(self, validated_token: Token) -> User:
+        if any(claim not in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if not validated_token["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return ClaimsUser.from_claims(user_id, validated_token["is_active"], validated_token["is_staff"])
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from user.models import User
+
+UNCACHED_FIELDS = {"password"}
+
+
+def _get_row_key(user_id: int) -> str:
+    return f"user:{user_id}:row"
+
+
+def get_user_row(user_id: int) -> Optional[dict]:
+    """Return the user's field values except the password, cached for USER_CACHE_TTL seconds"""
+    key = _get_row_key(user_id)
+    row = cache.get(key)
+    if row is None:
+        fields = [field.attname for field in User._meta.concrete_fields if field.attname not in UNCACHED_FIELDS]
+        row = User.objects.filter(pk=user_id).values(*fields).first()
+        if row is None:
+            return None
+        cache.set(key, row, timeout=settings.USER_CACHE_TTL)
+    return row
+
+
+def invalidate_user_row(user_id: int) -> None:
+    cache.delete(_get_row_key(user_id))
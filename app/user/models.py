@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, router
 
 from common.models import get_upload_path
 
@@ -10,3 +10,32 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+
+
+class ClaimsUser(User):
+    """User built from token claims, the other fields are loaded together from the user cache on first access"""
+    CLAIM_FIELDS = ("id", "is_staff", "is_active")
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, is_active: bool, is_staff: bool) -> "ClaimsUser":
+        # from_db() expects values in concrete field order
+        user_id = cls._meta.pk.to_python(user_id)
+        return cls.from_db(router.db_for_read(cls), cls.CLAIM_FIELDS, (user_id, is_staff, is_active))
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None) -> None:
+        deferred_fields = self.get_deferred_fields()
+        if fields is None or from_queryset is not None or not set(fields) <= deferred_fields:
+            return super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        from user.cache import get_user_row
+
+        row = get_user_row(self.pk)
+        if row is None:
+            raise User.DoesNotExist()
+        for attname in deferred_fields & row.keys():
+            setattr(self, attname, row[attname])
+        remaining_fields = set(fields) - row.keys()
+        if remaining_fields:
+            super().refresh_from_db(using=using, fields=remaining_fields)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user import cache, models
+
+
+@receiver([post_save, post_delete], sender=models.User)
+@receiver([post_save, post_delete], sender=models.ClaimsUser)
+def invalidate_user_row(sender, instance: models.User, **kwargs) -> None:
+    cache.invalidate_user_row(instance.pk)
@@ -0,0 +1,62 @@
+"""
+Simple load test for the /task/ endpoints.
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --concurrency 32 --requests 2000
+
+Fires GET requests at /task/list/ and, when --task-id is given, at /task/<task-id>/ from a thread pool
+and prints throughput and latency percentiles for each endpoint.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url: str) -> tuple:
+    started_at = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except urllib.error.URLError:
+        status = None
+    return status, time.perf_counter() - started_at
+
+
+def run(url: str, concurrency: int, requests: int) -> None:
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, [url] * requests))
+    elapsed = time.perf_counter() - started_at
+    latencies = sorted(latency * 1000 for status, latency in results if status == 200)
+    errors = sum(status != 200 for status, _ in results)
+    print(f"{url}")
+    print(f"  requests: {requests}, errors: {errors}, concurrency: {concurrency}")
+    print(f"  throughput: {requests / elapsed:.1f} req/s")
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(f"  latency ms: p50 {percentiles[49]:.1f}, p95 {percentiles[94]:.1f}, p99 {percentiles[98]:.1f}")
+    elif latencies:
+        print(f"  latency ms: {latencies[0]:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the /task/ endpoints")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--task-id", type=int)
+    args = parser.parse_args()
+
+    run(f"{args.url}/task/list/", args.concurrency, args.requests)
+    if args.task_id:
+        run(f"{args.url}/task/{args.task_id}/", args.concurrency, args.requests)
+
+
+if __name__ == "__main__":
+    main()